@@ -1,36 +1,81 @@
 import random
 import time
 import heapq
-import networkx as nx
 import inventory
+from dstar_lite import DStarLite
+from hierarchical import HierarchicalPathfinder
+from pathfinding import GridPathfinder
+
+
+class SearchTimeout(Exception):
+    """Se acabó el presupuesto de tiempo de la búsqueda iterativa de expectimax."""
 
 
 class AIController:
-    def __init__(self, dificulty="easy", game=None):
+    def __init__(self, dificulty="easy", game=None, clock=None, use_networkx=False, path_heuristic=False,
+                 search_budget_ms=None, flow_fields=None):
         self.dificulty = dificulty
         self.game = game
+        # Reloj en segundos usado para el ritmo de movimiento; el juego pasa su tiempo simulado
+        self.clock = clock if clock is not None else time.monotonic
         # Horizonte de anticipación pequeño (2-3 acciones por delante)
         # Depth 2 significa: evalúa tu movimiento -> posibles eventos aleatorios -> tu próximo movimiento
         self.max_depth = 2  # Limited horizon: 2-3 actions ahead
-        self.last_move_time = 0  # Track when the last move was made
+        self.last_move_time = None  # Track when the last move was made (None: can move right away)
         self.move_delay = 0.5  # 0.5 seconds delay between moves
 
+        # Tabla de transposición de expectimax: {(x, y, depth, is_max_node): (score, move)}
+        self.transposition_table = {}
+        self.table_context = None  # contexto (inventario, clima, trabajos visibles) de la tabla
+        self.max_table_entries = 50000
+        self.table_hits = 0
+        self.leaf_context = None  # parte de la evaluación que no depende de la posición (get_leaf_context)
+        self.upper_bounds = {}  # cotas superiores de nodos para la poda: {(x, y, depth): cota}
+        self.move_hints = {}  # mejor movimiento de cada nodo MAX en la última búsqueda: {(x, y): move}
+        # Profundización iterativa: con search_budget_ms (ms por decisión) el AI medio busca tan
+        # profundo como alcance el tiempo, hasta max_search_depth; con None usa max_depth fijo
+        self.search_budget_ms = search_budget_ms
+        self.max_search_depth = 8
+        self.search_deadline = None
+        self.last_search_depth = 0
+        self.bound_cache = {}  # cotas ALT ya calculadas por par (tile de la hoja, tile del objetivo)
+
         # Loop detection
         self.position_history = []  # Track recent positions
         self.max_history = 8  # Keep track of last 8 positions
         self.loop_detected = False
         self.loop_break_moves = 0  # Counter for how many moves to break loop
 
-        # Dijkstra pathfinding state (hard difficulty) usando NetworkX
+        # Dijkstra pathfinding state (hard difficulty)
         self.current_path = []  # Lista de movimientos (dx, dy) a seguir
         self.current_target = None  # Objetivo actual (x, y)
-        self.city_graph = None  # Grafo de la ciudad (NetworkX Graph)
+        self.city_graph = None  # Grafo de la ciudad (NetworkX Graph), solo con use_networkx
+        self.pathfinder = None  # GridPathfinder sobre los grids planos del mapa
+        self.path_tree = None  # (inicio, costos, árbol de predecesores) de la última decisión
+        # HPA* para mapas de al menos hierarchical_min_tiles tiles: el camino se busca sobre la
+        # abstracción por clusters y se refina un tramo a la vez mientras el personaje avanza
+        self.hierarchical = None
+        self.hierarchical_min_tiles = 40000
+        self.abstract_path = []  # tiles abstractos que faltan recorrer del camino de HPA*
+        # Cierres de calles: versión de Map.closure_version ya aplicada al pathfinder y D* Lite
+        # hacia el objetivo actual para reparar el camino cuando se cierra o reabre un tile
+        self.closure_version = 0
+        self.replanner = None
+        # FlowFieldCache opcional (se comparte entre varios AI): con ella el AI difícil lee costos y
+        # caminos de campos de flujo por destino en vez de buscar desde su posición en cada decisión
+        self.flow_fields = flow_fields
         self.graph_needs_update = True  # Flag para actualizar el grafo
+        self.weather_bucket = None  # Condición de clima con la que se calcularon los costos y el camino
+        # use_networkx=True usa el grafo de NetworkX (se importa solo en ese caso).
+        # path_heuristic=True usa A* con heurística Manhattan: mismo costo, pero entre caminos
+        # de igual costo puede elegir otro distinto al de nx.dijkstra_path.
+        self.use_networkx = use_networkx
+        self.path_heuristic = path_heuristic
 
     def manage_move(self, character, weather=None, inventory=None):
         # Check if enough time has passed since the last move
-        current_time = time.time()
-        if current_time - self.last_move_time < self.move_delay:
+        current_time = self.clock()
+        if self.last_move_time is not None and current_time - self.last_move_time < self.move_delay:
             return (0, 0)  # No movement, not enough time has passed
 
         # Update the last move time
@@ -120,7 +165,10 @@ class AIController:
                     return random.choice(valid_directions)
 
         # Ejecutar el algoritmo Expectimax y obtener el mejor movimiento
-        _, best_move = self.expectimax(character, self.max_depth, True, weather, inventory)
+        if self.search_budget_ms is not None:
+            _, best_move, self.last_search_depth = self.iterative_expectimax(character, weather, inventory)
+        else:
+            _, best_move = self.expectimax(character, self.max_depth, True, weather, inventory)
 
         # If expectimax returns None or invalid move, use random valid move
         if not best_move or not self.is_valid_move(character, best_move):
@@ -147,6 +195,11 @@ class AIController:
         2. Para cada movimiento, calculas el PROMEDIO de los posibles eventos aleatorios
         3. Eliges el movimiento con el MEJOR valor esperado
 
+        Los nodos solo guardan la posición (x, y): lo demás que lee evaluate_state (stamina,
+        inventario, clima, trabajos visibles) es igual en todo el árbol. Por eso el valor de un
+        nodo depende solo de (posición, profundidad, tipo de nodo) y se guarda en una tabla de
+        transposición, que se reutiliza entre decisiones mientras ese contexto no cambie.
+
         Args:
             character: El personaje AI
             depth: Qué tan profundo explorar (0 = evaluar inmediatamente)
@@ -157,41 +210,138 @@ class AIController:
         Returns:
             (score, move): La puntuación esperada y el mejor movimiento
         """
+        table = self.get_transposition_table(character, weather, inventory)
+        if depth > 0:
+            # Todas las hojas que faltan en la tabla se evalúan juntas antes de recorrer el árbol
+            # (como ya están todas evaluadas, este recorrido no usa poda)
+            leaf_is_max = is_max_node if depth % 2 == 0 else not is_max_node
+            leaves = [position for position in self.collect_leaf_positions(character.tile_x, character.tile_y, depth)
+                      if (position[0], position[1], 0, leaf_is_max) not in table]
+            if leaves:
+                scores = self.evaluate_positions(leaves, character, weather, inventory, self.leaf_context)
+                for (x, y), score in zip(leaves, scores):
+                    table[(x, y, 0, leaf_is_max)] = (score, None)
+        score, move, _ = self.expectimax_node(character.tile_x, character.tile_y, depth, is_max_node,
+                                              character, weather, inventory, table)
+        return score, move
+
+    def iterative_expectimax(self, character, weather=None, inventory=None, budget_ms=None):
+        """
+        Profundización iterativa: busca con depth 1, 2, 3, ... hasta max_search_depth o hasta que
+        se acabe el presupuesto de budget_ms milisegundos, y devuelve (score, move, depth) de la
+        última profundidad completa. Si el tiempo se acaba a mitad de una iteración, esa iteración
+        se descarta (depth 1 siempre se completa). Cada iteración prueba primero, en cada nodo MAX,
+        el mejor movimiento de la anterior, y reutiliza sus valores exactos de la tabla.
+        """
+        budget_ms = self.search_budget_ms if budget_ms is None else budget_ms
+        deadline = time.perf_counter() + budget_ms / 1000
+        table = self.get_transposition_table(character, weather, inventory)
+        result = (float('-inf'), None, 0)
+        for depth in range(1, self.max_search_depth + 1):
+            self.search_deadline = deadline if depth > 1 else None
+            try:
+                score, move, _ = self.expectimax_node(character.tile_x, character.tile_y, depth, True,
+                                                      character, weather, inventory, table, prune=True)
+            except SearchTimeout:
+                break
+            finally:
+                self.search_deadline = None
+            result = (score, move, depth)
+            if time.perf_counter() >= deadline:
+                break
+        return result
+
+    def collect_leaf_positions(self, x, y, depth):
+        """Posiciones distintas a las que se llega con exactamente depth movimientos válidos desde (x, y)."""
+        mapa = self.game.mapa
+        width, height, blocked = mapa.width, mapa.height, mapa.blocked_grid
+        frontier = {(x, y)}
+        for _ in range(depth):
+            next_frontier = set()
+            for fx, fy in frontier:
+                for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+                    new_x, new_y = fx + dx, fy + dy
+                    if 0 <= new_x < width and 0 <= new_y < height and not blocked[new_y * width + new_x]:
+                        next_frontier.add((new_x, new_y))
+            frontier = next_frontier
+        return sorted(frontier)
+
+    def expectimax_node(self, x, y, depth, is_max_node, character, weather, inventory, table,
+                        alpha=float('-inf'), prune=False):
+        """
+        Nodo (x, y) del árbol de expectimax con poda. Devuelve (score, move, exact).
+
+        Con prune=True, alpha es el valor que este nodo tiene que superar para cambiar la decisión de arriba.
+        Si se demuestra que no puede superarlo, se corta y devuelve exact=False: score es entonces
+        solo una cota superior (menor que alpha). Solo los valores exactos se guardan en table,
+        así una entrada sirve para cualquier alpha.
+
+        - Nodo CHANCE (Star1): con los hijos ya vistos y una cota superior de los pendientes
+          (node_upper_bound), si ni con todos los pendientes en la cota el promedio llega a alpha,
+          se corta.
+        - Nodo MAX: cada hijo se busca con alpha = mejor valor hasta ahora (menos un margen, para
+          que los empates se resuelvan igual que sin poda: gana el primero en el orden
+          arriba, abajo, izquierda, derecha). Se prueba primero el mejor movimiento de la
+          iteración anterior (move_hints).
+        """
+        key = (x, y, depth, is_max_node)
+        entry = table.get(key)
+        if entry is not None:
+            self.table_hits += 1
+            return entry[0], entry[1], True
+        if self.search_deadline is not None and time.perf_counter() > self.search_deadline:
+            raise SearchTimeout()
+
         # Caso base: Si llegamos a depth 0, evaluamos el estado actual
         if depth == 0:
-            return self.evaluate_state(character, weather, inventory), None
+            score = self.evaluate_positions([(x, y)], character, weather, inventory, self.leaf_context)[0]
+            table[key] = (score, None)
+            return score, None, True
 
+        mapa = self.game.mapa
+        width, height, blocked = mapa.width, mapa.height, mapa.blocked_grid
         moves = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # up, down, left, right
+        # Movimientos válidos (mismo criterio que is_valid_move)
+        children = [move for move in moves
+                    if 0 <= x + move[0] < width and 0 <= y + move[1] < height
+                    and not blocked[(y + move[1]) * width + x + move[0]]]
 
         if is_max_node:  # NODO MAX: Tu turno - MAXIMIZA la puntuación
             best_score = float('-inf')
             best_move = None
+            best_index = len(moves)
+            best_exact = True
+            upper = float('-inf')  # mayor cota de los hijos cortados
+
+            hint = self.move_hints.get((x, y))
+            ordered = children
+            if hint in children and hint != children[0]:
+                ordered = [hint] + [move for move in children if move != hint]
 
             # Evalúa cada movimiento posible
-            for move in moves:
-                if self.is_valid_move(character, move):
-                    # Simula el movimiento creando un personaje temporal en la nueva posición
-                    temp_character = type('obj', (object,), {
-                        'tile_x': character.tile_x + move[0],
-                        'tile_y': character.tile_y + move[1],
-                        'resistencia': character.resistencia,
-                        'resistencia_exhausto': character.resistencia_exhausto,
-                        'inventory': getattr(character, 'inventory', None)
-                    })()
-
-                    # Si estamos en el último nivel, evalúa directamente
-                    if depth == 1:
-                        score = self.evaluate_state(temp_character, weather, inventory)
-                    else:
-                        # Si no, recursivamente explora el siguiente nivel (CHANCE node)
-                        score, _ = self.expectimax(temp_character, depth - 1, False, weather, inventory)
-
-                    # Quedarse con el MEJOR movimiento (maximizar)
-                    if score > best_score:
-                        best_score = score
-                        best_move = move
-
-            return best_score, best_move
+            for move in ordered:
+                child_alpha = alpha
+                if prune and best_score > float('-inf'):
+                    child_alpha = max(alpha, best_score - self.prune_margin(best_score))
+                # El siguiente nivel es un nodo CHANCE (en el último nivel, una hoja)
+                score, _, exact = self.expectimax_node(x + move[0], y + move[1], depth - 1, False,
+                                                       character, weather, inventory, table, child_alpha, prune)
+                if not exact:
+                    upper = max(upper, score)
+                    continue
+
+                # Quedarse con el MEJOR movimiento (maximizar); en empate, el primero en moves
+                index = moves.index(move)
+                if score > best_score or (score == best_score and index < best_index):
+                    best_score = score
+                    best_move = move
+                    best_index = index
+
+            if upper > best_score or best_move is None and upper > float('-inf'):
+                # Ningún hijo llega a alpha: el valor exacto no importa arriba
+                return max(upper, best_score), best_move, False
+            self.move_hints[(x, y)] = best_move
+            entry = (best_score, best_move)
 
         else:  # NODO CHANCE: Eventos aleatorios - Calcula el VALOR ESPERADO (promedio)
             """
@@ -204,32 +354,88 @@ class AIController:
             Calculamos el VALOR ESPERADO = PROMEDIO de todas las puntuaciones posibles
             """
             total_score = 0.0
-            count = 0
+            count = len(children)
+
+            # Cota superior de cada hijo: sus hojas también están a depth movimientos de (x, y),
+            # así que sirve la cota de este nodo (solo hace falta si hay algo que superar)
+            bound = None
+            if alpha > float('-inf'):
+                bound = self.node_upper_bound(x, y, depth)
 
             # Suma las puntuaciones de todos los posibles resultados
-            for move in moves:
-                if self.is_valid_move(character, move):
-                    # Simula un posible resultado aleatorio
-                    temp_character = type('obj', (object,), {
-                        'tile_x': character.tile_x + move[0],
-                        'tile_y': character.tile_y + move[1],
-                        'resistencia': character.resistencia,
-                        'resistencia_exhausto': character.resistencia_exhausto,
-                        'inventory': getattr(character, 'inventory', None)
-                    })()
-
-                    if depth == 1:
-                        score = self.evaluate_state(temp_character, weather, inventory)
-                    else:
-                        # El siguiente nivel es un MAX node (tu turno otra vez)
-                        score, _ = self.expectimax(temp_character, depth - 1, True, weather, inventory)
-
-                    total_score += score
-                    count += 1
+            for i, move in enumerate(children):
+                pending = count - i - 1
+                child_alpha = float('-inf')
+                if bound is not None:
+                    # El hijo tiene que llegar a esto para que el promedio pueda llegar a alpha
+                    child_alpha = count * alpha - total_score - pending * bound
+                # El siguiente nivel es un MAX node (tu turno otra vez)
+                score, _, exact = self.expectimax_node(x + move[0], y + move[1], depth - 1, True,
+                                                       character, weather, inventory, table, child_alpha, prune)
+                total_score += score
+                if bound is not None and (not exact or (pending and (total_score + pending * bound) / count < alpha)):
+                    # Ni con los hijos pendientes en su cota el promedio llega a alpha
+                    return (total_score + pending * bound) / count, None, False
 
             # Retorna el PROMEDIO (valor esperado)
-            return total_score / count if count > 0 else 0, None
+            entry = (total_score / count if count > 0 else 0, None)
 
+        table[key] = entry
+        return entry[0], entry[1], True
+
+    def prune_margin(self, score):
+        """Margen de la poda: cubre el redondeo de las cotas para que nunca corten un empate."""
+        return 1e-9 * (1.0 + abs(score))
+
+    def node_upper_bound(self, x, y, depth):
+        """
+        Cota superior del valor de un nodo en (x, y) con depth movimientos por delante. Cada hoja
+        está a distancia Manhattan >= m - depth de cada objetivo (m: la distancia desde (x, y)), la
+        distancia que usa el pago nunca es menor que la Manhattan, y el pago de cada trabajo
+        (payout / (distancia + 1) * peso del rango) baja con la distancia.
+        """
+        key = (x, y, depth)
+        bound = self.upper_bounds.get(key)
+        if bound is not None:
+            return bound
+        terms, distance_cost, weather_penalty = self.leaf_context
+        payout = 0.0
+        for target_x, target_y, _, _, job_payout, near, mid, far in terms:
+            if job_payout <= 0:
+                continue
+            distance = max(0, abs(x - target_x) + abs(y - target_y) - depth)
+            if distance <= 15:
+                payout += job_payout / (distance + 1) * near
+            elif distance <= 30:
+                payout += job_payout / (distance + 1) * mid
+            else:
+                payout += job_payout / (distance + 1) * far
+        bound = 2.0 * payout - distance_cost - 1.5 * weather_penalty
+        self.upper_bounds[key] = bound
+        return bound
+
+    def get_transposition_table(self, character, weather, inventory):
+        """
+        Tabla de transposición de expectimax para el contexto actual. Se vacía cuando cambia algo
+        que afecta evaluate_state fuera de la posición: la versión del inventario, el multiplicador
+        del clima, los trabajos visibles o el umbral de stamina baja. Con ella se renuevan las
+        partes de la evaluación que no dependen de la posición (leaf_context) y las cotas de poda.
+        """
+        char_inventory = inventory if inventory is not None else getattr(character, 'inventory', None)
+        visible_jobs = self.game.job_manager.visible_jobs
+        context = (
+            id(char_inventory), getattr(char_inventory, 'version', None),
+            weather.current_multiplier if weather is not None else None,
+            tuple(id(job) for job in visible_jobs),
+            character.resistencia < 30
+        )
+        if context != self.table_context or len(self.transposition_table) > self.max_table_entries:
+            self.table_context = context
+            self.transposition_table = {}
+            self.upper_bounds = {}
+            self.move_hints = {}
+            self.leaf_context = self.get_leaf_context(character, weather, inventory)
+        return self.transposition_table
 
     def evaluate_state(self, character, weather=None, inventory=None):
         """
@@ -262,6 +468,91 @@ class AIController:
         # Puntuación final: maximiza ganancias, minimiza costos
         return α * expected_payout - β * distance_cost - γ * weather_penalty
 
+    def evaluate_positions(self, positions, character, weather=None, inventory=None, leaf_context=None):
+        """
+        evaluate_state para un lote de posiciones (las hojas de expectimax) en una sola pasada.
+        Lo que no depende de la posición se calcula una vez (get_leaf_context, o leaf_context si ya
+        se tiene): distance_cost, weather_penalty y, por cada trabajo, su objetivo y los pesos de
+        cada rango de distancia. Para cada posición solo queda recorrer esa lista de trabajos.
+        Devuelve los scores en el orden de positions, exactamente iguales a los de evaluate_state
+        (mismas operaciones en el mismo orden).
+        """
+        α, β, γ = 2.0, 1.0, 1.5
+        if leaf_context is None:
+            leaf_context = self.get_leaf_context(character, weather, inventory)
+        terms, distance_cost, weather_penalty = leaf_context
+
+        landmarks = self.get_landmarks()
+        node_grid = landmarks.node_grid if landmarks is not None else None
+        index_bound = landmarks.index_bound if landmarks is not None else None
+        width = landmarks.width if landmarks is not None else 0
+        size = len(node_grid) if node_grid is not None else 0
+        blocked_step = GridPathfinder.BLOCKED_COST - 1.0
+        if len(self.bound_cache) > self.max_table_entries:
+            self.bound_cache = {}
+        bound_cache = self.bound_cache
+
+        scores = []
+        for x, y in positions:
+            start_index = y * width + x
+            use_bound = node_grid is not None and bool(node_grid[start_index])
+            payout = 0.0
+            for target_x, target_y, goal_index, goal_blocked, job_payout, near, mid, far in terms:
+                distance = abs(x - target_x) + abs(y - target_y)
+                if use_bound and goal_index is not None:
+                    # Las cotas no dependen del clima ni del inventario: se guardan entre decisiones
+                    pair = start_index * size + goal_index
+                    bound = bound_cache.get(pair)
+                    if bound is None:
+                        bound = index_bound(start_index, goal_index)
+                        bound_cache[pair] = bound
+                    if goal_blocked:
+                        bound -= blocked_step
+                    distance = max(distance, bound)
+                if distance <= 15:
+                    payout += job_payout / (distance + 1) * near
+                elif distance <= 30:
+                    payout += job_payout / (distance + 1) * mid
+                else:
+                    payout += job_payout / (distance + 1) * far
+            scores.append(α * payout - β * distance_cost - γ * weather_penalty)
+        return scores
+
+    def get_leaf_context(self, character, weather=None, inventory=None):
+        """(términos de pago, distance_cost, weather_penalty): la parte de evaluate_state que no depende de la posición."""
+        return (self.get_payout_terms(character, inventory),
+                self.calculate_distance_cost(character, weather, inventory),
+                self.calculate_weather_penalty(weather))
+
+    def get_payout_terms(self, character, inventory=None):
+        """
+        Los trabajos que suma calculate_payout, en el mismo orden, como tuplas
+        (x, y, índice del objetivo para landmarks o None, objetivo bloqueado, payout,
+        peso cerca, peso medio, peso lejos).
+        """
+        char_inventory = inventory if inventory is not None else character.inventory
+        landmarks = self.get_landmarks()
+        mapa = self.game.mapa
+        targets = []
+        for job in char_inventory.get_picked_jobs():
+            targets.append((job.dropoff, job.payout, 3.0, 2.0, 1.5))
+        for job in char_inventory.get_jobs():
+            if not job.is_picked_up():
+                targets.append((job.pickup, job.payout, 0.8, 0.5, 0.3))
+        for job in self.game.job_manager.visible_jobs:
+            if not job.is_picked_up():
+                targets.append((job.pickup, job.payout, 0.6, 0.4, 0.2))
+
+        terms = []
+        for (target_x, target_y), job_payout, near, mid, far in targets:
+            goal_index = None
+            if (landmarks is not None and 0 <= target_x < landmarks.width and 0 <= target_y < landmarks.height
+                    and landmarks.node_grid[target_y * landmarks.width + target_x]):
+                goal_index = target_y * landmarks.width + target_x
+            terms.append((target_x, target_y, goal_index, mapa.is_blocked(target_x, target_y),
+                          job_payout, near, mid, far))
+        return terms
+
     def calculate_payout(self, character, inventory=None):
         """
         Calcula el pago esperado basado en:
@@ -272,6 +563,7 @@ class AIController:
         Usa la fórmula: payout / (distance + 1) * weight
         - Divide entre distancia para priorizar trabajos cercanos
         - Multiplica por peso según tipo y distancia
+        - distance es la estimación de estimate_distance (landmarks), no solo Manhattan
         """
 
 
@@ -284,7 +576,7 @@ class AIController:
         picked_jobs = char_inventory.get_picked_jobs()
         for job in picked_jobs:
             # Job is picked up, calculate distance to dropoff
-            distance = abs(character.tile_x - job.dropoff[0]) + abs(character.tile_y - job.dropoff[1])
+            distance = self.estimate_distance(character, job.dropoff)
             # Always give value to picked up jobs regardless of distance (already committed)
             if distance <= 15:
                 # High value for nearby deliveries
@@ -301,7 +593,7 @@ class AIController:
         for job in all_jobs:
             if not job.is_picked_up():
                 # Job needs pickup
-                distance = abs(character.tile_x - job.pickup[0]) + abs(character.tile_y - job.pickup[1])
+                distance = self.estimate_distance(character, job.pickup)
                 if distance <= 15:
                     # Good value for nearby pickups
                     payout += job.payout / (distance + 1) * 0.8
@@ -319,7 +611,7 @@ class AIController:
         for job in visible_jobs:
             if not job.is_picked_up():
                 # Available job for pickup
-                distance = abs(character.tile_x - job.pickup[0]) + abs(character.tile_y - job.pickup[1])
+                distance = self.estimate_distance(character, job.pickup)
                 if distance <= 15:
                     # Good value for nearby new jobs
                     payout += job.payout / (distance + 1) * 0.6
@@ -332,6 +624,29 @@ class AIController:
 
         return payout
 
+    def get_landmarks(self):
+        """LandmarkOracle cargado por el juego al iniciar, o None si no hay."""
+        return getattr(self.game, "landmarks", None)
+
+    def estimate_distance(self, character, target):
+        """
+        Distancia estimada del personaje hasta target sin buscar caminos.
+        Con landmarks es la cota ALT del costo real (rodea edificios), nunca menor que la
+        distancia Manhattan. Los pickups y dropoffs están en edificios y se alcanzan desde
+        un tile vecino, así que el último paso cuenta como un paso normal y no como BLOCKED_COST.
+        """
+        start = (character.tile_x, character.tile_y)
+        manhattan = abs(start[0] - target[0]) + abs(start[1] - target[1])
+        landmarks = self.get_landmarks()
+        if landmarks is None:
+            return manhattan
+        bound = landmarks.lower_bound(start, target)
+        if bound is None:
+            return manhattan
+        if self.game.mapa.is_blocked(target[0], target[1]):
+            bound -= GridPathfinder.BLOCKED_COST - 1.0
+        return max(manhattan, bound)
+
     def calculate_distance_cost(self, character, weather=None, inventory=None):
         """
         Calcula el COSTO de movimiento basado en:
@@ -380,27 +695,29 @@ class AIController:
     def is_valid_move(self, character, move):
         """Check if move is valid."""
 
+        mapa = self.game.mapa
         new_x = character.tile_x + move[0]
         new_y = character.tile_y + move[1]
 
-        if new_y < 0 or new_y >= self.game.mapa.height:
+        if new_y < 0 or new_y >= mapa.height:
             return False
-        if new_x < 0 or new_x >= self.game.mapa.width:
+        if new_x < 0 or new_x >= mapa.width:
             return False
 
-        return not self.game.mapa.is_blocked(new_x, new_y)
+        return not mapa.blocked_grid[new_y * mapa.width + new_x]
 
     def change_dificulty(self, new_dificulty):
         self.dificulty = new_dificulty
 
     def dijkstra_move(self, character, weather=None, inventory=None):
         """
-        Hard difficulty: Dijkstra con grafo ponderado usando NetworkX.
+        Hard difficulty: Dijkstra con grafo ponderado.
 
         ALGORITMO:
-        1. Construye un grafo de la ciudad con NetworkX (nodos = tiles, aristas = conexiones)
+        1. Prepara el GridPathfinder sobre los grids del mapa (o el grafo de NetworkX con use_networkx)
         2. Peso de arista = costo de superficie + modificador de clima
-        3. Usa nx.dijkstra_path() para encontrar el camino óptimo
+        3. Busca el camino óptimo con un heap binario (mismo camino que nx.dijkstra_path)
+           En mapas muy grandes usa HPA* (HierarchicalPathfinder) y refina el camino por tramos
         4. Optimiza secuencia: maximiza ganancia/costo, prioriza entregas
         """
         if character.resistencia_exhausto:
@@ -408,11 +725,24 @@ class AIController:
 
         char_inventory = inventory
 
+        # Costos del bucket de clima actual (invalida el camino si la condición cambió)
+        self.update_weather_bucket(weather)
+        # Cierres y reaperturas de calles desde la última decisión (repara el camino)
+        self.update_closures(character)
+
         # Construir/actualizar el grafo de la ciudad si es necesario
-        if self.city_graph is None or self.graph_needs_update:
-            self.build_city_graph(weather)
+        if self.use_networkx:
+            if self.city_graph is None or self.graph_needs_update:
+                self.build_city_graph(weather)
+                self.graph_needs_update = False
+        elif self.pathfinder is None or self.graph_needs_update:
+            self.build_pathfinder(weather)
             self.graph_needs_update = False
 
+        # Con HPA*, al terminar un tramo del camino se refina el siguiente
+        if self.current_target and not self.current_path and self.abstract_path:
+            self.current_path = self.refine_next_segment()
+
         # Si ya tenemos un camino válido, seguirlo
         if self.current_path and self.current_target:
             current_pos = (character.tile_x, character.tile_y)
@@ -430,6 +760,8 @@ class AIController:
                     self.current_target = None
 
         # Recolectar trabajos disponibles
+        self.path_tree = None
+        self.abstract_path = []
         job_targets = self.collect_job_targets(char_inventory)
 
         if not job_targets:
@@ -441,33 +773,144 @@ class AIController:
         if not best_target:
             return (0, 0)
 
-        # Calcular camino óptimo usando NetworkX Dijkstra
+        # Camino óptimo: se lee del árbol de la búsqueda hecha en choose_best_job
         start = (character.tile_x, character.tile_y)
         goal = best_target['position']
 
-        try:
-            # nx.dijkstra_path encuentra el camino de menor costo
-            path = nx.dijkstra_path(self.city_graph, start, goal, weight='weight')
+        path = self.find_path(start, goal)
+        if path is None:
+            # No hay camino válido al objetivo
+            return (0, 0)
 
-            if len(path) < 2:
-                return (0, 0)
+        if len(path) < 2:
+            return (0, 0)
 
-            # Guardar objetivo y convertir path a movimientos
-            self.current_target = goal
-            self.current_path = self.path_to_moves(path)
+        # Guardar objetivo y convertir path a movimientos
+        self.current_target = goal
+        self.current_path = self.path_to_moves(path)
 
-            # Ejecutar primer movimiento
-            if self.current_path:
-                next_move = self.current_path.pop(0)
-                if self.is_valid_move(character, next_move):
-                    return next_move
-
-        except (nx.NetworkXNoPath, nx.NodeNotFound):
-            # No hay camino válido al objetivo
-            return (0, 0)
+        # Ejecutar primer movimiento
+        if self.current_path:
+            next_move = self.current_path.pop(0)
+            if self.is_valid_move(character, next_move):
+                return next_move
 
         return (0, 0)
 
+    def build_pathfinder(self, weather):
+        """Prepara el GridPathfinder con el modificador de clima actual y los grids de todas las condiciones."""
+        self.closure_version = self.game.mapa.closure_version
+        self.replanner = None
+        self.pathfinder = GridPathfinder(self.game.mapa, self.get_weather_modifier(weather),
+                                         landmarks=self.get_landmarks())
+        self.pathfinder.precompute_weather(self.get_weather_modifiers(weather))
+        mapa = self.game.mapa
+        if self.flow_fields is None and mapa.width * mapa.height >= self.hierarchical_min_tiles:
+            self.hierarchical = HierarchicalPathfinder(self.pathfinder)
+
+    def find_path(self, start, goal):
+        """
+        Camino de menor costo [(x, y), ...] de start a goal, o None si no existe.
+        Si la última búsqueda de get_path_costs partió de start y alcanzó goal, el camino
+        se lee de su árbol de predecesores sin volver a buscar.
+
+        Con HPA* devuelve solo el primer tramo refinado; el resto queda en abstract_path.
+        """
+        if self.hierarchical is not None and not self.use_networkx:
+            return self.find_hierarchical_path(start, goal)
+        if self.flow_fields is not None and not self.use_networkx:
+            return self.get_flow_field(goal).path_from(start)
+        if self.path_tree is not None:
+            tree_start, costs, tree = self.path_tree
+            if tree_start == start and goal in costs:
+                if self.use_networkx:
+                    return tree[goal]
+                return self.pathfinder.path_from_tree(tree, goal)
+        if self.use_networkx:
+            import networkx as nx
+            try:
+                # nx.dijkstra_path encuentra el camino de menor costo
+                return nx.dijkstra_path(self.city_graph, start, goal, weight='weight')
+            except (nx.NetworkXNoPath, nx.NodeNotFound):
+                return None
+        return self.pathfinder.find_path(start, goal, heuristic=self.path_heuristic)
+
+    def get_path_costs(self, start, goals, on_settle=None):
+        """
+        Costo del camino más barato de start a cada goal con una sola búsqueda desde start,
+        que se detiene al asentar todos los goals (o cuando on_settle devuelve True).
+        Devuelve {goal: costo} (sin los inalcanzables) y guarda el árbol de predecesores para find_path.
+        """
+        if self.use_networkx:
+            import networkx as nx
+            try:
+                distances, paths = nx.single_source_dijkstra(self.city_graph, start, weight='weight')
+            except nx.NodeNotFound:
+                distances, paths = {}, {}
+            costs = {goal: distances[goal] for goal in goals if goal in distances}
+            self.path_tree = (start, costs, paths)
+            return costs
+        if self.flow_fields is not None:
+            # Costo de cada objetivo leído de su campo de flujo (se calcula solo si no está en caché)
+            costs = {}
+            for goal in goals:
+                cost = self.get_flow_field(goal).cost_from(start)
+                if cost is not None:
+                    costs[goal] = cost
+            self.path_tree = None
+            return costs
+        if self.hierarchical is not None:
+            # Una consulta de HPA* por objetivo; el árbol guarda el camino abstracto de cada uno
+            costs, paths = {}, {}
+            for goal in goals:
+                result = self.hierarchical.search(start, goal)
+                if result is not None:
+                    costs[goal], paths[goal] = result
+            self.path_tree = (start, costs, paths)
+            return costs
+        costs, tree = self.pathfinder.search_targets(start, goals, on_settle)
+        self.path_tree = (start, costs, tree)
+        return costs
+
+    def get_flow_field(self, goal):
+        """Campo de flujo hacia goal con el clima y los cierres actuales (de la caché si ya existe)."""
+        self.flow_fields.set_context((id(self.game.mapa), self.pathfinder.weather_modifier, self.closure_version))
+        return self.flow_fields.get(self.pathfinder, goal)
+
+    def find_hierarchical_path(self, start, goal):
+        """
+        Busca el camino abstracto de HPA* (o lo toma de get_path_costs), guarda sus tiles en
+        abstract_path y devuelve el primer tramo ya refinado.
+        """
+        abstract = None
+        if self.path_tree is not None:
+            tree_start, costs, paths = self.path_tree
+            if tree_start == start and goal in costs:
+                abstract = paths[goal]
+        if abstract is None:
+            result = self.hierarchical.search(start, goal)
+            if result is None:
+                return None
+            abstract = result[1]
+        self.abstract_path = list(abstract)
+        return self.refine_abstract_segment()
+
+    def refine_abstract_segment(self):
+        """Refina el primer tramo pendiente de abstract_path: [(x, y), ...] o None si ya no hay camino."""
+        if len(self.abstract_path) < 2:
+            self.abstract_path = []
+            return None
+        path = self.hierarchical.refine_segment(self.abstract_path[0], self.abstract_path[1])
+        del self.abstract_path[0]
+        if len(self.abstract_path) < 2 or path is None:
+            self.abstract_path = []
+        return path
+
+    def refine_next_segment(self):
+        """Movimientos del siguiente tramo del camino de HPA* (vacío si no quedan tramos)."""
+        path = self.refine_abstract_segment()
+        return self.path_to_moves(path) if path else []
+
     def build_city_graph(self, weather):
         """
         Construye un GRAFO PONDERADO de la ciudad usando NetworkX.
@@ -478,33 +921,33 @@ class AIController:
         - Cada conexión entre tiles adyacentes = ARISTA
         - Peso de arista = costo de superficie + modificador de clima
 
-        Usa nx.DiGraph() para grafo dirigido (aunque en este caso es simétrico)
+        Usa nx.DiGraph() para grafo dirigido (aunque en este caso es simétrico).
+        Solo se usa con use_networkx=True; por defecto el AI usa GridPathfinder.
         """
+        import networkx as nx
 
         mapa = self.game.mapa
+        self.closure_version = mapa.closure_version
         # Crear grafo dirigido
         self.city_graph = nx.DiGraph()
 
         # PASO 1: Agregar todos los tiles accesibles (NO bloqueados) como nodos
         for y in range(mapa.height):
+            blocked_row = mapa.get_blocked_row(y)
             for x in range(mapa.width):
-                if not mapa.is_blocked(x, y):
+                if not blocked_row[x]:
                     self.city_graph.add_node((x, y))
 
         # PASO 2: Agregar tiles bloqueados ADYACENTES a tiles accesibles
         tiles_to_add = set()
         for y in range(mapa.height):
+            blocked_row = mapa.get_blocked_row(y)
             for x in range(mapa.width):
-                if not mapa.is_blocked(x, y):
-                    # Este tile es accesible, revisar sus vecinos bloqueados
-                    for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                        neighbor_x, neighbor_y = x + dx, y + dy
-
-                        # Verificar que el vecino está dentro del mapa
-                        if (0 <= neighbor_x < mapa.width and
-                            0 <= neighbor_y < mapa.height and
-                            mapa.is_blocked(neighbor_x, neighbor_y)):
-                            # Vecino bloqueado adyacente a tile accesible
+                if not blocked_row[x]:
+                    # Este tile es accesible, revisar sus vecinos bloqueados dentro del mapa
+                    for neighbor_x, neighbor_y, neighbor_blocked in mapa.get_neighbors(x, y):
+                        if neighbor_blocked and not mapa.is_closed(neighbor_x, neighbor_y):
+                            # Vecino bloqueado adyacente a tile accesible (los tiles cerrados no son nodos)
                             tiles_to_add.add((neighbor_x, neighbor_y))
 
         # Agregar los tiles bloqueados adyacentes al grafo
@@ -512,23 +955,22 @@ class AIController:
             self.city_graph.add_node(tile)
 
         # PASO 3: Conectar tiles adyacentes con aristas ponderadas
+        surface_grid = mapa.surface_grid
+        weather_modifier = self.get_weather_modifier(weather)
         for y in range(mapa.height):
             for x in range(mapa.width):
                 # Solo crear aristas desde nodos que están en el grafo
                 if (x, y) in self.city_graph:
                     # Explorar 4 vecinos (arriba, abajo, izq, der)
-                    for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                        neighbor_x, neighbor_y = x + dx, y + dy
-
+                    for neighbor_x, neighbor_y, neighbor_blocked in mapa.get_neighbors(x, y):
                         # Verificar que el vecino está en el grafo
                         if (neighbor_x, neighbor_y) in self.city_graph:
-                            # Verificar si el tile destino está bloqueado
-                            if mapa.is_blocked(neighbor_x, neighbor_y):
+                            if neighbor_blocked:
                                 # Si el tile está bloqueado, el camino hacia él tiene peso 10
                                 edge_weight = 10.0
                             else:
-                                # Calcular peso normal de la arista
-                                edge_weight = self.get_tile_cost(neighbor_x, neighbor_y, weather)
+                                # Peso normal: costo de superficie + modificador de clima
+                                edge_weight = surface_grid[neighbor_y * mapa.width + neighbor_x] + weather_modifier
 
                             # Agregar arista con peso
                             self.city_graph.add_edge((x, y), (neighbor_x, neighbor_y), weight=edge_weight)
@@ -541,19 +983,98 @@ class AIController:
         """
 
         mapa = self.game.mapa
-        base_cost = 1.0
 
-        # Obtener costo de superficie si está disponible
+        # Obtener costo de superficie
         base_cost = mapa.get_surface_weight(x, y)
 
-        # Agregar modificador de clima
-        weather_modifier = 0.0
-        weather_mult = weather.current_multiplier
+        return base_cost + self.get_weather_modifier(weather)
+
+    def get_weather_modifier(self, weather):
+        """
+        Modificador de clima que se suma al costo de cada tile accesible. Se usa el multiplicador
+        de la condición actual (uno de los nueve buckets de Weather.multipliers), así los costos
+        solo cambian cuando cambia la condición y cada bucket tiene su grid de costos precalculado.
+        """
+        if weather is None:
+            return 0.0
+        return self.modifier_for_multiplier(weather.multipliers[weather.current_condition])
+
+    def get_weather_modifiers(self, weather):
+        """Modificadores de las nueve condiciones de clima, para precalcular sus grids de costo."""
+        if weather is None:
+            return [0.0]
+        return [self.modifier_for_multiplier(multiplier) for multiplier in weather.multipliers.values()]
+
+    def modifier_for_multiplier(self, weather_mult):
         if weather_mult < 1.0:
             # Mal clima aumenta el costo
-            weather_modifier = (1.0 - weather_mult) * 2.0
+            return (1.0 - weather_mult) * 2.0
+        return 0.0
+
+    def update_weather_bucket(self, weather):
+        """
+        Si cambió la condición de clima desde la última decisión, cambia el pathfinder al grid de
+        costos de la nueva condición (ya precalculado, sin reconstruir nada) y descarta el camino
+        que se venía siguiendo, que se calculó con los costos anteriores.
+        """
+        bucket = weather.current_condition if weather is not None else None
+        if bucket == self.weather_bucket:
+            return
+        self.weather_bucket = bucket
+        self.current_path = []
+        self.current_target = None
+        self.path_tree = None
+        self.abstract_path = []
+        self.replanner = None
+        if self.use_networkx:
+            # El grafo de NetworkX guarda los pesos en las aristas: hay que reconstruirlo
+            self.graph_needs_update = True
+        elif self.pathfinder is not None:
+            self.pathfinder.set_weather_modifier(self.get_weather_modifier(weather))
+
+    def update_closures(self, character):
+        """
+        Aplica los cierres y reaperturas de calles del mapa ocurridos desde la última decisión. En vez
+        de descartar el camino que se venía siguiendo, lo repara con D* Lite: la búsqueda hacia el
+        mismo objetivo se reutiliza y solo se recalculan los nodos afectados por los tiles cambiados.
+        """
+        mapa = self.game.mapa
+        if mapa.closure_version == self.closure_version:
+            return
+        changes = mapa.get_closure_changes(self.closure_version)
+        self.closure_version = mapa.closure_version
+        self.path_tree = None
+        if self.use_networkx:
+            # El grafo de NetworkX se reconstruye completo
+            self.graph_needs_update = True
+            self.current_path = []
+            self.current_target = None
+            return
+        if self.pathfinder is None:
+            return
+        changed = self.pathfinder.update_tiles(changes)
+        if self.hierarchical is not None:
+            # Con HPA* alcanza con volver a buscar el camino abstracto
+            self.hierarchical.update_tiles(changed)
+            self.current_path = []
+            self.current_target = None
+            self.abstract_path = []
+            return
+        if self.current_target is None:
+            self.replanner = None
+            return
 
-        return base_cost + weather_modifier
+        start = (character.tile_x, character.tile_y)
+        if self.replanner is not None and self.replanner.goal == self.current_target:
+            self.replanner.update_tiles(changed)
+        else:
+            self.replanner = DStarLite(self.pathfinder, start, self.current_target)
+        path = self.replanner.find_path(start)
+        if path is None or len(path) < 2:
+            self.current_path = []
+            self.current_target = None
+        else:
+            self.current_path = self.path_to_moves(path)
 
     def collect_job_targets(self, inventory):
         """
@@ -602,41 +1123,89 @@ class AIController:
         LÓGICA DE DECISIÓN: Elige trabajo que maximiza ganancia/costo.
 
         Criterios:
-        1. Minimiza desplazamientos (usa costo real de NetworkX Dijkstra)
+        1. Minimiza desplazamientos (usa costo real del camino más barato)
         2. Maximiza ganancias
         3. Prioriza entregas > pickups > oportunidades
 
         Métrica: score = (payout * priority) / (costo_camino + 1)
+
+        Con landmarks, la cota inferior del costo de cada objetivo da una cota superior de su
+        score, y la búsqueda se corta en cuanto ningún objetivo sin asentar puede superar al
+        mejor ya asentado. El objetivo elegido es el mismo que con la búsqueda completa.
         """
-        if not job_targets or not self.city_graph:
+        graph = self.city_graph if self.use_networkx else self.pathfinder
+        if not job_targets or not graph:
             return None
 
         start = (character.tile_x, character.tile_y)
         best_target = None
         best_score = float('-inf')
 
+        # Costo real del camino más barato a todos los objetivos en una sola búsqueda
+        on_settle = None
+        if (not self.use_networkx and self.hierarchical is None and self.flow_fields is None and
+                self.get_landmarks() is not None):
+            on_settle = self.make_ranking_cutoff(start, job_targets)
+        path_costs = self.get_path_costs(start, [target['position'] for target in job_targets], on_settle)
+
         for target in job_targets:
             goal = target['position']
 
-            try:
-                # Calcular costo real usando NetworkX Dijkstra
-                path_cost = nx.dijkstra_path_length(self.city_graph, start, goal, weight='weight')
-
-                # Calcular score: maximiza (ganancia * prioridad) / costo
-                payout = target['payout']
-                priority = target['priority']
-                score = (payout * priority) / (path_cost + 1)
-
-                if score > best_score:
-                    best_score = score
-                    best_target = target
-
-            except (nx.NetworkXNoPath, nx.NodeNotFound):
+            path_cost = path_costs.get(goal)
+            if path_cost is None:
                 # No hay camino a este trabajo, ignorar
                 continue
 
+            # Calcular score: maximiza (ganancia * prioridad) / costo
+            payout = target['payout']
+            priority = target['priority']
+            score = (payout * priority) / (path_cost + 1)
+
+            if score > best_score:
+                best_score = score
+                best_target = target
+
         return best_target
 
+    def make_ranking_cutoff(self, start, job_targets):
+        """
+        Prepara el on_settle de choose_best_job. Dijkstra asienta los objetivos en orden de costo,
+        así que todo objetivo sin asentar cuesta al menos el costo del último asentado (y al menos
+        su cota ALT). Si ni con ese costo mínimo su score supera al mejor ya asentado (o lo empata
+        estando después en la lista, como en el desempate de choose_best_job), se deja de buscar.
+        """
+        landmarks = self.get_landmarks()
+        pending = []
+        by_goal = {}
+        for index, target in enumerate(job_targets):
+            goal = target['position']
+            bound = landmarks.lower_bound(start, goal)
+            if bound is None:
+                continue
+            # Margen para que el redondeo de las restas de la cota no la deje sobre el costo real
+            bound = max(0.0, bound - 1e-9 * (bound + 1.0))
+            value = target['payout'] * target['priority']
+            pending.append([index, goal, value, bound])
+            by_goal.setdefault(goal, []).append(pending[-1])
+        best = [float('-inf'), len(job_targets)]
+
+        def on_settle(goal, cost):
+            for entry in by_goal.get(goal, ()):
+                index, _, value, _ = entry
+                score = value / (cost + 1)
+                if score > best[0] or (score == best[0] and index < best[1]):
+                    best[0], best[1] = score, index
+                entry[3] = None  # asentado
+            for index, _, value, bound in pending:
+                if bound is None:
+                    continue
+                score_bound = value / (max(bound, cost) + 1)
+                if score_bound > best[0] or (score_bound == best[0] and index < best[1]):
+                    return False
+            return True
+
+        return on_settle
+
     def path_to_moves(self, path):
         """
         Convierte lista de posiciones [(x1,y1), (x2,y2), ...] a movimientos [(dx,dy), ...]
@@ -10,9 +10,13 @@ from map import Map
 from stack import Stack
 from UI import UI
 from SaveData import SaveData
+from dirty_regions import DirtyRegions
+from camera import Camera
 import sys
 import json
 from AIController import AIController
+from landmarks import LandmarkOracle
+from expiry import ExpiryScheduler
 
 
 class CourierQuestGame:
@@ -31,10 +35,28 @@ class CourierQuestGame:
         self.tiempo_inicio = None
         self.tiempo_juego_acumulado = 0
         self.tiempo_pausa_inicio = None
+        # Tiempo de juego (ms, sin pausas) hasta el que ya se simuló la lógica en pasos fijos
+        self.sim_time_ms = None
         self.last_deadline_penalty = False
         self.paused = False
         self.save_system = SaveData()
         self.use_plain_jobs = use_plain_jobs
+        # Regiones de pantalla modificadas en cada frame (se presentan solo esas)
+        self.dirty_regions = DirtyRegions()
+        self.drawn_scene = None
+        # Última (posición, inventario, versión) revisada de cada repartidor para recoger/entregar
+        self.proximity_checked = {}
+        # Vencimiento por deadline de los trabajos del jugador, del AI y de los visibles
+        self.expiry_scheduler = ExpiryScheduler()
+        self.expiry_scheduler.watch("player", lambda: self.character.inventory.jobs,
+                                    lambda: (id(self.character.inventory), self.character.inventory.version),
+                                    lambda job_id: self.character.inventory.get_job_by_id(job_id))
+        self.expiry_scheduler.watch("ai", lambda: self.aiCharacter.inventory.jobs,
+                                    lambda: (id(self.aiCharacter.inventory), self.aiCharacter.inventory.version),
+                                    lambda job_id: self.aiCharacter.inventory.get_job_by_id(job_id))
+        self.expiry_scheduler.watch("visible", lambda: self.job_manager.visible_jobs,
+                                    lambda: (id(self.job_manager), self.job_manager.version),
+                                    lambda job_id: self.job_manager.visible.get(job_id))
 
         # AI difficulty (easy/medium/hard)
         self.ai_difficulty = ai_difficulty
@@ -50,11 +72,14 @@ class CourierQuestGame:
             self.aiCharacter = Character(0, 0, tile_size=20, screen=self.screen, top_bar_height=constants.TOP_BAR_HEIGHT)
             self.restore_game_state(saved_game_state)
             # Create AI controller once using chosen difficulty
-            self.ai_controller = AIController(dificulty=self.ai_difficulty, game=self)
+            self.ai_controller = AIController(dificulty=self.ai_difficulty, game=self, clock=self.get_sim_time,
+                                              search_budget_ms=constants.AI_SEARCH_BUDGET_MS)
         else:
             self.load_resources()
             # Create AI controller once using chosen difficulty
-            self.ai_controller = AIController(dificulty=self.ai_difficulty, game=self)
+            self.ai_controller = AIController(dificulty=self.ai_difficulty, game=self, clock=self.get_sim_time,
+                                              search_budget_ms=constants.AI_SEARCH_BUDGET_MS)
+        self.init_camera()
 
     def init_pygame(self):
         pygame.init()
@@ -66,6 +91,15 @@ class CourierQuestGame:
         pygame.display.set_caption("Courier Quest")
         api.api_request()
 
+    def init_camera(self):
+        """Crea la cámara que sigue al jugador y pre-escala los sprites de cada nivel de zoom."""
+        view_height = constants.HEIGHT_SCREEN - constants.TOP_BAR_HEIGHT - constants.BOTTOM_BAR_HEIGHT
+        self.camera = Camera(self.mapa.width, self.mapa.height, self.mapa.tile_size,
+                             constants.WIDTH_SCREEN, view_height, top=constants.TOP_BAR_HEIGHT)
+        self.mapa.prepare_zoom_levels(int(self.mapa.tile_size * zoom) for zoom in constants.ZOOM_LEVELS)
+        self.character.prepare_zoom_levels(constants.ZOOM_LEVELS)
+        self.aiCharacter.prepare_zoom_levels(constants.ZOOM_LEVELS)
+
     def pause_menu(self):
         self.tiempo_pausa_inicio = pygame.time.get_ticks()
         while self.paused:
@@ -78,6 +112,7 @@ class CourierQuestGame:
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_c:
                         self.paused = False
+                        self.dirty_regions.mark_full()
                         if self.tiempo_pausa_inicio is not None:
                             pausa_duracion = pygame.time.get_ticks() - self.tiempo_pausa_inicio
                             self.tiempo_inicio += pausa_duracion
@@ -170,6 +205,7 @@ class CourierQuestGame:
             self.character.inventory.picked_jobs = [Job.from_dict(j) for j in picked_jobs_data]
         else:
             self.character.inventory.picked_jobs = [job for job in self.character.inventory.jobs if job.is_picked_up()]
+        self.character.inventory.version += 1
 
     def _restore_ai_character_data(self, ai_character_data):
         self.aiCharacter.tile_x = ai_character_data.get("tile_x", 0)
@@ -198,6 +234,7 @@ class CourierQuestGame:
             self.aiCharacter.inventory.picked_jobs = [Job.from_dict(j) for j in picked_jobs_data]
         else:
             self.aiCharacter.inventory.picked_jobs = [job for job in self.aiCharacter.inventory.jobs if job.is_picked_up()]
+        self.aiCharacter.inventory.version += 1
 
     def _restore_job_manager_data(self, job_data):
         pending_jobs = self._load_pending_jobs(job_data)
@@ -240,6 +277,8 @@ class CourierQuestGame:
 
     def load_resources(self, minimal: bool = False):
         self.mapa = Map("data/json_files/city_map.json", tile_size=20, top_bar_height=constants.TOP_BAR_HEIGHT)
+        # Cotas de distancia del AI: se leen del archivo junto al mapa (se calculan si el mapa cambió)
+        self.landmarks = LandmarkOracle.load_or_build(self.mapa, "data/json_files/city_map.json")
         jobs_list = load_jobs("data/json_files/city_jobs.json")
         self.job_manager = JobManager(jobs_list)
         if not minimal:
@@ -285,14 +324,6 @@ class CourierQuestGame:
         }
 
     def handle_events(self):
-        for job in self.aiCharacter.inventory.jobs[:]:
-            if not job.is_picked_up():
-                if self.aiCharacter.inventory.pickup_job(job, (self.aiCharacter.tile_x, self.aiCharacter.tile_y)):
-                        self.aiCharacter.update_stats()
-        for job in [j for j in self.aiCharacter.inventory.jobs if j.is_picked_up()]:
-            self._process_dropoff_for(self.aiCharacter, job)
-            self.aiCharacter.update_stats()
-        self.handle_ai_movement()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
@@ -305,6 +336,12 @@ class CourierQuestGame:
                     self.show_inventory = not self.show_inventory
                     self.inventory_order = None
                     self.selected_job_index = 0
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    if self.camera.zoom_in():
+                        self.dirty_regions.mark_full()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    if self.camera.zoom_out():
+                        self.dirty_regions.mark_full()
                 elif self.show_inventory:
                     if self.inventory_order == 'deadline':
                         current_jobs = self.character.inventory.filter_by_deadline()
@@ -378,32 +415,48 @@ class CourierQuestGame:
                                     self.character.tile_y * self.character.tile_size + self.character.tile_size // 2 + constants.TOP_BAR_HEIGHT
                                 )
                     # Player inventory processing
-                    for job in self.character.inventory.jobs[:]:
-                        if not job.is_picked_up():
-                            if self.character.inventory.pickup_job(job, (self.character.tile_x, self.character.tile_y)):
-                                self.character.update_stats()
-                    for job in [j for j in self.character.inventory.jobs if j.is_picked_up()]:
-                        self._process_dropoff_for(self.character, job)
-                        self.character.update_stats()
+                    self._process_jobs_near(self.character)
                     # AI inventory processing (static AI)
 
                         
+    def _update_ai_inventory(self):
+        self._process_jobs_near(self.aiCharacter)
+
+    def _process_jobs_near(self, who: Character):
+        """
+        Recoge y entrega los trabajos de who que se activan en su tile (hash espacial del inventario).
+        Si no cambió de tile ni cambió su inventario desde la última revisión, no hace nada.
+        """
+        inventory = who.inventory
+        position = (who.tile_x, who.tile_y)
+        if self.proximity_checked.get(id(who)) == (position, id(inventory), inventory.version):
+            return
+        for job in inventory.get_pickups_near(position):
+            if inventory.pickup_job(job, position):
+                who.update_stats()
+        for job in inventory.get_dropoffs_near(position):
+            self._process_dropoff_for(who, job)
+            who.update_stats()
+        self.proximity_checked[id(who)] = (position, id(inventory), inventory.version)
+
     def handle_ai_movement(self):
         # Use the existing AIController instance to manage AI movement
         if self.ai_controller is None:
             # Fallback: create one with default difficulty
-            self.ai_controller = AIController(dificulty=self.ai_difficulty or "medium", game=self)
-        current_time = pygame.time.get_ticks()
+            self.ai_controller = AIController(dificulty=self.ai_difficulty or "medium", game=self, clock=self.get_sim_time,
+                                              search_budget_ms=constants.AI_SEARCH_BUDGET_MS)
+        # El ritmo del AI se mide en tiempo de juego simulado, no en frames dibujados
+        current_time = self.sim_time_ms or 0
+        if current_time < self.ai_last_move_time:
+            # Partida guardada con el reloj anterior: reiniciar la referencia
+            self.ai_last_move_time = current_time - self.ai_move_interval
         if current_time - self.ai_last_move_time >= self.ai_move_interval:
             dx, dy = self.ai_controller.manage_move(self.aiCharacter, self.weather, self.aiCharacter.inventory)
-            print(dx)
-            print (dy)
             self.aiCharacter.movement(dx, dy, self.mapa, weather=self.weather)
             self.ai_last_move_time = current_time
         if self.aiCharacter.resistencia_exhausto:
             self.aiCharacter.restore_stamina()
             return
-        print(self.aiCharacter.inventory.picked_jobs)
 
 
     def _process_dropoff_with_reputacion(self, job):
@@ -414,25 +467,9 @@ class CourierQuestGame:
     def _process_dropoff_for(self, who: Character, job):
         entregado = who.inventory.deliver_job(job, (who.tile_x, who.tile_y))
         if entregado:
-            try:
-                now = pygame.time.get_ticks()
-                elapsed_seconds = int((now - self.tiempo_inicio) / 1000) if self.tiempo_inicio else 0
-                tiempo_deadline = job.deadline.split('T')[1] if 'T' in str(job.deadline) else str(job.deadline)
-                min_deadline = int(tiempo_deadline.split(':')[0])
-                sec_deadline = int(tiempo_deadline.split(':')[1])
-                deadline_seconds = min_deadline * 60 + sec_deadline
-                if elapsed_seconds <= deadline_seconds - int(0.2 * deadline_seconds):
-                    who.job_delivered_early_reputation()
-                elif elapsed_seconds <= deadline_seconds:
-                    who.job_delivered_in_time_reputation()
-                else:
-                    segundos_tarde = elapsed_seconds - deadline_seconds
-                    who.job_delivered_late_reputacion(segundos_tarde)
-            except Exception:
-                # Corrección: método en Character es job_delivered_in_time_reputation
-                who.job_delivered_in_time_reputation()
-            payout = int(job.payout * who.pay_multiplier_reputation())
-            who.score += payout
+            now = pygame.time.get_ticks()
+            elapsed_seconds = int((now - self.tiempo_inicio) / 1000) if self.tiempo_inicio else 0
+            who.complete_delivery(job, elapsed_seconds)
     def _update_movement_ai(self):
         # AI estático: sin movimiento
         pass
@@ -444,6 +481,10 @@ class CourierQuestGame:
     def _get_elapsed_seconds(self):
         return int((pygame.time.get_ticks() - self.tiempo_inicio) / 1000)
 
+    def get_sim_time(self):
+        """Tiempo de juego simulado en segundos (avanza en pasos fijos y se detiene en pausa)."""
+        return (self.sim_time_ms or 0) / 1000
+
     def _update_visible_jobs(self, elapsed_seconds):
         if self.first_frame:
             self.job_manager.update_visible_jobs(0)
@@ -451,8 +492,8 @@ class CourierQuestGame:
         else:
             self.job_manager.update_visible_jobs(elapsed_seconds)
 
-    def _update_weather(self):
-        self.weather.update(1 / constants.FPS)
+    def _update_weather(self, delta_time):
+        self.weather.update(delta_time)
 
     def _process_pending_jobs(self):
         if not self.show_job_decision:
@@ -467,27 +508,57 @@ class CourierQuestGame:
         self.character.restore_stamina()
 
     def _remove_expired_jobs(self, elapsed_seconds):
-        for job in self.character.inventory.jobs[:]:
-            if job.is_expired(elapsed_seconds):
-                self.character.inventory.remove_job(job.id)
-                self.character.job_expired_reputation()
+        # Solo se tocan los trabajos que vencieron en este paso (todos ellos), sin recorrer listas
+        for source, job in self.expiry_scheduler.pop_expired(elapsed_seconds):
+            if source == "visible":
+                self.job_manager.remove_job(job.id)
+                if self.pending_job is job:
+                    self.show_job_decision = False
+                    self.pending_job = None
+                    self.job_decision_message = ""
+                continue
+            courier = self.character if source == "player" else self.aiCharacter
+            courier.inventory.remove_job(job.id)
+            courier.job_expired_reputation()
+            courier.update_stats()
+            if source == "player":
                 self.last_deadline_penalty = True
-                break
 
-    def update_game_state(self):
+    def update_game_state(self, delta_time=constants.SIMULATION_STEP_MS / 1000):
+        """Avanza la lógica del juego un paso fijo de delta_time segundos."""
         self._init_time_if_needed()
         elapsed_seconds = self._get_elapsed_seconds()
+        self._update_ai_inventory()
+        self.handle_ai_movement()
         self._update_visible_jobs(elapsed_seconds)
-        self._update_weather()
+        self._update_weather(delta_time)
         self._process_pending_jobs()
         self._recover_stamina_if_idle()
         self._remove_expired_jobs(elapsed_seconds)
         self.character.update_stats()
-        # AI estático: sin movimiento
+
+    def advance_simulation(self):
+        """
+        Acumula el tiempo de juego transcurrido desde el último frame y lo consume en pasos fijos
+        de constants.SIMULATION_STEP_MS. Un frame lento ejecuta varios pasos para ponerse al día;
+        si el atraso supera MAX_SIMULATION_STEPS se descarta para no entrar en espiral.
+        """
+        self._init_time_if_needed()
+        step_ms = constants.SIMULATION_STEP_MS
+        game_time_ms = pygame.time.get_ticks() - self.tiempo_inicio
+        if self.sim_time_ms is None:
+            # Primer frame (o partida cargada): simular un paso desde el tiempo de juego actual
+            self.sim_time_ms = game_time_ms - step_ms
+        steps = 0
+        while self.sim_time_ms + step_ms <= game_time_ms and self.running:
+            if steps == constants.MAX_SIMULATION_STEPS:
+                self.sim_time_ms = game_time_ms
+                break
+            self.sim_time_ms += step_ms
+            self.update_game_state(step_ms / 1000)
+            steps += 1
 
     def draw(self):
-        #print(self.aiCharacter.inventory.picked_jobs)
-        print(self.aiCharacter.score)
         reputacion = self.character.reputation
         if self.character.score >= self.objetivo_valor:
             score_data = self.calculate_final_score()
@@ -503,16 +574,55 @@ class CourierQuestGame:
             self.running = False
             self.hud.show_game_over(reason="HAHAHAHA YOU LOST TO AN AI")
         else:
-            self.mapa.draw_map(self.screen)
-            self.character.draw(self.screen)
-            self.aiCharacter.draw(self.screen)
-            tiempo_restante = max(0, self.tiempo_limite - self._get_elapsed_seconds())
-            money_objective = self.objetivo_valor
-            self.hud.draw(self.character, tiempo_restante=tiempo_restante, money_objective=money_objective, reputacion=reputacion, weather=self.weather, ai_character=self.aiCharacter)
-            if self.show_inventory:
-                self.hud.draw_inventory(self.character.inventory, order=self.inventory_order, tiempo_limite=self.tiempo_limite, selected_job_index=self.selected_job_index)
-            if self.show_job_decision:
-                self.hud.draw_job_decision(self.pending_job, job_decision_message=self.job_decision_message)
+            self.draw_scene(reputacion)
+            return
+        # Las pantallas de fin de juego reemplazan la escena completa
+        self.dirty_regions.mark_full()
+
+    def draw_scene(self, reputacion):
+        """
+        Dibuja el frame redibujando solo las regiones que cambiaron (personajes, marcadores,
+        campos del HUD y popups). Abrir o cerrar un popup, o cerrar o reabrir una calle, cuenta
+        como cambio de escena.
+        """
+        dirty = self.dirty_regions
+        camera = self.camera
+        scene = (self.show_inventory, self.show_job_decision, self.mapa.closure_version)
+        if scene != self.drawn_scene:
+            dirty.mark_full()
+            self.drawn_scene = scene
+        # Si la cámara se desplazó para seguir al jugador, cambia toda la vista
+        if camera.follow(self.character.tile_x, self.character.tile_y):
+            dirty.mark_full()
+
+        # 1. Regiones que cambiaron sobre el mapa
+        dirty.mark_all(self.character.get_dirty_rects(camera))
+        dirty.mark_all(self.aiCharacter.get_dirty_rects(camera))
+        dirty.mark_all(self.hud.get_marker_dirty_rects(self.character, ai_character=self.aiCharacter, camera=camera))
+        redraw_inventory = self.show_inventory and self.hud.inventory_needs_redraw(
+            self.character.inventory, order=self.inventory_order, tiempo_limite=self.tiempo_limite,
+            selected_job_index=self.selected_job_index, dirty_regions=dirty)
+        redraw_decision = self.show_job_decision and self.hud.job_decision_needs_redraw(
+            self.pending_job, job_decision_message=self.job_decision_message, dirty_regions=dirty)
+        if redraw_decision and self.show_inventory and not redraw_inventory:
+            # El popup de decisión se dibuja sobre el inventario: si se redibuja, el inventario también
+            redraw_inventory = self.hud.inventory_needs_redraw(
+                self.character.inventory, order=self.inventory_order, tiempo_limite=self.tiempo_limite,
+                selected_job_index=self.selected_job_index, dirty_regions=dirty)
+
+        # 2. Restaurar el fondo del mapa solo en esas regiones (o completo en un cambio de escena)
+        self.mapa.draw_map(self.screen, areas=None if dirty.full_redraw else dirty.rects, camera=camera)
+
+        # 3. Dibujar entidades, HUD y popups encima
+        self.character.draw(self.screen, camera)
+        self.aiCharacter.draw(self.screen, camera)
+        tiempo_restante = max(0, self.tiempo_limite - self._get_elapsed_seconds())
+        money_objective = self.objetivo_valor
+        self.hud.draw(self.character, tiempo_restante=tiempo_restante, money_objective=money_objective, reputacion=reputacion, weather=self.weather, ai_character=self.aiCharacter, dirty_regions=dirty, camera=camera)
+        if redraw_inventory:
+            self.hud.draw_inventory(self.character.inventory, order=self.inventory_order, tiempo_limite=self.tiempo_limite, selected_job_index=self.selected_job_index, areas=redraw_inventory)
+        if redraw_decision:
+            self.hud.draw_job_decision(self.pending_job, job_decision_message=self.job_decision_message)
 
     def get_tiempo_juego_acumulado(self):
         return self.tiempo_juego_acumulado
@@ -570,10 +680,10 @@ class CourierQuestGame:
         clock = pygame.time.Clock()
         while self.running:
             self.handle_events()
-            if not self.paused:
-                self.update_game_state()
+            if not self.paused and self.running:
+                self.advance_simulation()
                 self.draw()
-            pygame.display.flip()
+            self.dirty_regions.present()
             clock.tick(constants.FPS)
         pygame.mixer.music.stop()
         pygame.quit()
@@ -1,49 +1,114 @@
 import pygame
 import constants
 from scoreboard import Scoreboard
+from assets import asset_manager
+from fonts import fonts, text_cache
+
+# Coordenada X donde empieza el campo de clima en la barra superior
+WEATHER_FIELD_X = 470
+
 
 class UI:
     def __init__(self, screen):
         self.screen = screen
-        if not pygame.font.get_init():
-            pygame.font.init()
-        self.font = pygame.font.SysFont(None, 24)
-        self.font_top = pygame.font.SysFont(None, 30)
-        self.font_info = pygame.font.SysFont(None, 20)
-        self.font_inventory = pygame.font.SysFont(None, 26)
+        # Todas las fuentes se crean una sola vez al iniciar
+        fonts.load()
+        self.font = fonts.get(24)
+        self.font_top = fonts.get(30)
+        self.font_info = fonts.get(20)
+        self.font_inventory = fonts.get(26)
         # Load HUD background image (used for topbar and navbar)
-        self.hud_img = pygame.image.load("sprites/hud.png").convert_alpha()
-        self.hud_img_top = pygame.transform.scale(self.hud_img, (constants.WIDTH_SCREEN, constants.TOP_BAR_HEIGHT))
-        self.hud_img_nav = pygame.transform.scale(self.hud_img, (constants.WIDTH_SCREEN, 55))
-
+        self.hud_img = asset_manager.get_image("sprites/hud.png")
+        self.hud_img_top = asset_manager.get_image("sprites/hud.png", (constants.WIDTH_SCREEN, constants.TOP_BAR_HEIGHT))
+        self.hud_img_nav = asset_manager.get_image("sprites/hud.png", (constants.WIDTH_SCREEN, 55))
+        # Pre-cargar los sprites de stamina para no leer archivos dentro del bucle de juego
+        for sprite_index in range(11):
+            asset_manager.get_image(f"sprites/stamina/stamina_{sprite_index}.png", (120, 40))
+        # Último estado dibujado de cada campo del HUD / popup y de los marcadores (regiones sucias)
+        self.field_states = {}
+        self.field_areas = {}
+        self.drawn_markers = []
+        # Fondos de los popups (imagen del HUD + textos fijos) compuestos una sola vez
+        self.popup_cache = {}
+
+    def refresh_field(self, name, area, state, dirty_regions=None):
+        """
+        Decide si un campo del HUD o un popup debe redibujarse: cambió su estado, alguna
+        región sucia lo toca o hay redibujo completo. En ese caso marca su área como sucia.
+        Sin dirty_regions siempre se redibuja.
+        """
+        if dirty_regions is None:
+            return True
+        if self.field_states.get(name) != state or dirty_regions.collides(area):
+            # Si el campo cambió de tamaño (p. ej. el inventario se achica) se restaura también el área anterior
+            previous_area = self.field_areas.get(name)
+            if previous_area is not None and previous_area != area:
+                dirty_regions.mark(previous_area)
+            self.field_states[name] = state
+            self.field_areas[name] = area
+            dirty_regions.mark(area)
+            return True
+        return False
+
+    def get_popup_chrome(self, name):
+        """Devuelve el fondo ya compuesto del popup indicado, construyéndolo la primera vez."""
+        chrome = self.popup_cache.get(name)
+        if chrome is None:
+            chrome = self.build_popup_chrome(name)
+            self.popup_cache[name] = chrome
+        return chrome
+
+    def build_popup_chrome(self, name):
+        """Compone el fondo y los textos fijos de un popup en una sola superficie."""
+        if name == "inventory":
+            # Fondo negro semitransparente; el título se dibuja aparte para no mezclar alphas
+            chrome = pygame.Surface((600, 400), pygame.SRCALPHA)
+            chrome.fill((0, 0, 0, 220))
+            return chrome
+
+        if name == "pause":
+            chrome = asset_manager.get_image("sprites/hud.png", (320, 240)).copy()
+            chrome.blit(text_cache.render(fonts.get(40), "PAUSA", (255, 255, 0)), (100, 25))
+            small_font = fonts.get(28)
+            chrome.blit(text_cache.render(small_font, "[G] Guardar partida", (200, 255, 200)), (50, 80))
+            chrome.blit(text_cache.render(small_font, "[C] Continuar", (200, 200, 255)), (50, 120))
+            chrome.blit(text_cache.render(small_font, "[Q] Salir", (255, 100, 100)), (50, 160))
+            return chrome
+
+        if name == "job_decision":
+            area = self.get_job_decision_rect()
+            chrome = asset_manager.get_image("sprites/hud.png", area.size).copy()
+            info_text = text_cache.render(fonts.get(22), "[A] Aceptar   [N] Rechazar", (0,0,0))
+            center = (constants.WIDTH_SCREEN//2 - area.x, constants.HEIGHT_SCREEN//2 - area.y)
+            chrome.blit(info_text, info_text.get_rect(center=center))
+            return chrome
+
+        if name == "difficulty":
+            area = self.get_difficulty_rect()
+            chrome = asset_manager.get_image("sprites/hud.png", area.size).copy()
+            title = text_cache.render(fonts.get(34), "Selecciona la dificultad de la AI", (255, 255, 0))
+            chrome.blit(title, title.get_rect(center=(constants.WIDTH_SCREEN // 2 - area.x, 28)))
+            help = text_cache.render(fonts.get(20), "← → : mover  | Enter: confirmar  | Esc: cancelar (medium por defecto)", (200, 200, 200))
+            chrome.blit(help, help.get_rect(center=(constants.WIDTH_SCREEN // 2 - area.x, area.height - 20)))
+            return chrome
+
+        raise ValueError(f"Popup desconocido: {name}")
 
     def show_pause_menu(self):
-        font = pygame.font.SysFont(None, 40)
-        small_font = pygame.font.SysFont(None, 28)
         popup_width = 320
         popup_height = 240
         popup_x = (constants.WIDTH_SCREEN - popup_width) // 2
         popup_y = (constants.HEIGHT_SCREEN - popup_height) // 2
-        hud_img = pygame.image.load("sprites/hud.png").convert_alpha()
-        hud_popup = pygame.transform.scale(hud_img, (popup_width, popup_height))
-        self.screen.blit(hud_popup, (popup_x, popup_y))
-        title = font.render("PAUSA", True, (255, 255, 0))
-        self.screen.blit(title, (popup_x + 100, popup_y + 25))
-        save_text = small_font.render("[G] Guardar partida", True, (200, 255, 200))
-        resume_text = small_font.render("[C] Continuar", True, (200, 200, 255))
-        exit_text = small_font.render("[Q] Salir", True, (255, 100, 100))
-        self.screen.blit(save_text, (popup_x + 50, popup_y + 80))
-        self.screen.blit(resume_text, (popup_x + 50, popup_y + 120))
-        self.screen.blit(exit_text, (popup_x + 50, popup_y + 160))
-        pygame.display.flip()
+        self.screen.blit(self.get_popup_chrome("pause"), (popup_x, popup_y))
+        pygame.display.update(pygame.Rect(popup_x, popup_y, popup_width, popup_height))
 
     def show_game_over(self, reason="Tiempo agotado"):
         """Muestra la pantalla de Game Over con el motivo."""
         self.screen.fill((0, 0, 0))
-        font = pygame.font.SysFont(None, 60)
-        text = font.render("GAME OVER", True, (255, 0, 0))
-        reason_font = pygame.font.SysFont(None, 30)
-        reason_text = reason_font.render(reason, True, (255, 255, 255))
+        font = fonts.get(60)
+        text = text_cache.render(font, "GAME OVER", (255, 0, 0))
+        reason_font = fonts.get(30)
+        reason_text = text_cache.render(reason_font, reason, (255, 255, 255))
         text_rect = text.get_rect(center=(constants.WIDTH_SCREEN // 2, constants.HEIGHT_SCREEN // 2 - 40))
         reason_rect = reason_text.get_rect(center=(constants.WIDTH_SCREEN // 2, constants.HEIGHT_SCREEN // 2 + 40))
         self.screen.blit(text, text_rect)
@@ -56,10 +121,10 @@ class UI:
         Muestra la pantalla de Victoria, guarda el puntaje y muestra el scoreboard resaltando el nuevo entry si corresponde.
         """
         self.screen.fill((0, 0, 0))
-        font = pygame.font.SysFont(None, 60)
-        text = font.render("VICTORIA", True, (0, 255, 0))
-        reason_font = pygame.font.SysFont(None, 30)
-        reason_text = reason_font.render(reason, True, (255, 255, 255))
+        font = fonts.get(60)
+        text = text_cache.render(font, "VICTORIA", (0, 255, 0))
+        reason_font = fonts.get(30)
+        reason_text = text_cache.render(reason_font, reason, (255, 255, 255))
         text_rect = text.get_rect(center=(constants.WIDTH_SCREEN // 2, 80))
         reason_rect = reason_text.get_rect(center=(constants.WIDTH_SCREEN // 2, 140))
         self.screen.blit(text, text_rect)
@@ -72,14 +137,14 @@ class UI:
         scores = scoreboard.get_scores()
 
         # Mostrar tabla de puntajes
-        table_font = pygame.font.SysFont(None, 32)
+        table_font = fonts.get(32)
         y_start = 200
         line_height = 40
-        self.screen.blit(table_font.render("Top 5 Puntajes", True, (255,255,255)), (constants.WIDTH_SCREEN//2 - 100, y_start))
+        self.screen.blit(text_cache.render(table_font, "Top 5 Puntajes", (255,255,255)), (constants.WIDTH_SCREEN//2 - 100, y_start))
         y = y_start + 40
         for idx, entry in enumerate(scores):
             color = (255, 255, 0) if idx == highlight_idx else (255, 255, 255)
-            entry_text = table_font.render(f"{idx+1}. {entry['score']}", True, color)
+            entry_text = text_cache.render(table_font, f"{idx+1}. {entry['score']}", color)
             self.screen.blit(entry_text, (constants.WIDTH_SCREEN//2 - 100, y))
             y += line_height
 
@@ -94,13 +159,13 @@ class UI:
         self.screen.fill((0, 0, 0))
 
         # Fuentes
-        title_font = pygame.font.SysFont(None, 60)
-        detail_font = pygame.font.SysFont(None, 30)
-        small_font = pygame.font.SysFont(None, 24)
-        scoreboard_font = pygame.font.SysFont(None, 28)
+        title_font = fonts.get(60)
+        detail_font = fonts.get(30)
+        small_font = fonts.get(24)
+        scoreboard_font = fonts.get(28)
 
         # Título principal
-        title = title_font.render("¡VICTORIA!", True, (0, 255, 0))
+        title = text_cache.render(title_font, "¡VICTORIA!", (0, 255, 0))
         title_rect = title.get_rect(center=(constants.WIDTH_SCREEN // 2, 40))
         self.screen.blit(title, title_rect)
 
@@ -132,7 +197,7 @@ class UI:
                 color = (255, 255, 255)  # Blanco para los demás
                 font = small_font
 
-            text = font.render(detail, True, color)
+            text = text_cache.render(font, detail, color)
             text_rect = text.get_rect(center=(constants.WIDTH_SCREEN // 2, y_pos))
             self.screen.blit(text, text_rect)
             y_pos += line_spacing
@@ -145,7 +210,7 @@ class UI:
 
         # Título del scoreboard
         scoreboard_y = constants.HEIGHT_SCREEN // 2 + 20
-        scoreboard_title = detail_font.render("TOP 5 PUNTAJES", True, (255, 255, 0))
+        scoreboard_title = text_cache.render(detail_font, "TOP 5 PUNTAJES", (255, 255, 0))
         scoreboard_title_rect = scoreboard_title.get_rect(center=(constants.WIDTH_SCREEN // 2, scoreboard_y))
         self.screen.blit(scoreboard_title, scoreboard_title_rect)
 
@@ -161,13 +226,13 @@ class UI:
             else:
                 color = (255, 255, 255)  # Blanco para los demás
 
-            score_text = scoreboard_font.render(f"{idx+1}. ${entry['score']}", True, color)
+            score_text = text_cache.render(scoreboard_font, f"{idx+1}. ${entry['score']}", color)
             score_rect = score_text.get_rect(center=(constants.WIDTH_SCREEN // 2, scoreboard_y))
             self.screen.blit(score_text, score_rect)
             scoreboard_y += 30
 
         # Instrucciones
-        instruction = small_font.render("Presiona cualquier tecla para salir", True, (200, 200, 200))
+        instruction = text_cache.render(small_font, "Presiona cualquier tecla para salir", (200, 200, 200))
         instruction_rect = instruction.get_rect(center=(constants.WIDTH_SCREEN // 2, constants.HEIGHT_SCREEN - 30))
         self.screen.blit(instruction, instruction_rect)
 
@@ -184,60 +249,86 @@ class UI:
         """Muestra el estado actual del clima en la barra superior."""
         if not weather:
             return
-        clima_text = self.font.render(
-            f"Clima: {weather.current_condition}", True, (107, 40, 20)
+        clima_text = text_cache.render(
+            self.font, f"Clima: {weather.current_condition}", (107, 40, 20)
         )
         self.screen.blit(clima_text, (475, 17))
 
-    def draw_topbar(self, character, money_objective=None, weather= None):
+    def draw_topbar(self, character, money_objective=None, weather= None, dirty_regions=None):
         top_bar_height = constants.TOP_BAR_HEIGHT
-        #Dibuja la imagen del fondo del HUD para el topbar
-        self.screen.blit(self.hud_img_top, (0, 0))
         dinero_ganado = character.get_score()
-        if money_objective is not None:
-            score_text = self.font_top.render(f"Puntuación: ${dinero_ganado} / ${money_objective}", True, (255, 255, 255))
-        else:
-            score_text = self.font_top.render(f"Puntuación: ${dinero_ganado}", True, (255, 255, 255))
-        text_rect = score_text.get_rect(topleft=(constants.WIDTH_SCREEN // 30 + 2, top_bar_height // 2 - 10))
-        self.screen.blit(score_text, text_rect)
-
-        if weather:
-            self.draw_weather(weather)
-
-    def draw_downbar(self, character, tiempo_restante=None, reputacion=None):
+        # Campo de puntuación (izquierda) y de clima (derecha), cada uno con su parte del fondo del HUD
+        score_area = pygame.Rect(0, 0, WEATHER_FIELD_X, top_bar_height)
+        if self.refresh_field("score", score_area, (dinero_ganado, money_objective), dirty_regions):
+            self.screen.set_clip(score_area)
+            self.screen.blit(self.hud_img_top, score_area.topleft, score_area)
+            if money_objective is not None:
+                score_text = text_cache.render_value("score", self.font_top, f"Puntuación: ${dinero_ganado} / ${money_objective}", (255, 255, 255))
+            else:
+                score_text = text_cache.render_value("score", self.font_top, f"Puntuación: ${dinero_ganado}", (255, 255, 255))
+            text_rect = score_text.get_rect(topleft=(constants.WIDTH_SCREEN // 30 + 2, top_bar_height // 2 - 10))
+            self.screen.blit(score_text, text_rect)
+            self.screen.set_clip(None)
+
+        weather_area = pygame.Rect(WEATHER_FIELD_X, 0, constants.WIDTH_SCREEN - WEATHER_FIELD_X, top_bar_height)
+        condition = weather.current_condition if weather else None
+        if self.refresh_field("weather", weather_area, condition, dirty_regions):
+            self.screen.set_clip(weather_area)
+            self.screen.blit(self.hud_img_top, weather_area.topleft, weather_area)
+            if weather:
+                self.draw_weather(weather)
+            self.screen.set_clip(None)
+
+    def get_downbar_y(self):
         hud_height = 55
         try:
-            hud_y = self.screen.get_height() - hud_height
+            return self.screen.get_height() - hud_height
         except Exception:
-            hud_y = constants.HEIGHT_SCREEN - hud_height
-        # Draw HUD background image for navbar
-        self.screen.blit(self.hud_img_nav, (0, hud_y))
+            return constants.HEIGHT_SCREEN - hud_height
+
+    def draw_downbar_field(self, name, x, width, state, dirty_regions=None):
+        """
+        Prepara un campo de la barra inferior: si debe redibujarse, restaura su parte del
+        fondo del HUD y deja el clip activo en su área. Devuelve True si hay que dibujarlo.
+        """
+        hud_y = self.get_downbar_y()
+        area = pygame.Rect(x, hud_y, width, self.hud_img_nav.get_height())
+        if not self.refresh_field(name, area, state, dirty_regions):
+            return False
+        self.screen.set_clip(area)
+        self.screen.blit(self.hud_img_nav, area.topleft, area.move(0, -hud_y))
+        return True
+
+    def draw_downbar(self, character, tiempo_restante=None, reputacion=None, dirty_regions=None):
+        hud_height = 55
         peso_actual = character.total_weight
-        peso_text = self.font.render(f"Peso actual: {peso_actual}", True, (255, 255, 255))
-        self.screen.blit(peso_text, (180, constants.HEIGHT_SCREEN - hud_height + 15))
+        if self.draw_downbar_field("peso", 180, 120, peso_actual, dirty_regions):
+            peso_text = text_cache.render_value("peso", self.font, f"Peso actual: {peso_actual}", (255, 255, 255))
+            self.screen.blit(peso_text, (180, constants.HEIGHT_SCREEN - hud_height + 15))
+            self.screen.set_clip(None)
         rep = reputacion if reputacion is not None else character.reputation
-        if rep >= 70:
-            rep_color = (0, 200, 255)
-        elif rep >= 30:
-            rep_color = (255, 200, 0)
-        else:
-            rep_color = (255, 50, 50)
-        rep_text = self.font.render(f"Reputación: {rep}", True, rep_color)
-        self.screen.blit(rep_text, (300, constants.HEIGHT_SCREEN - hud_height + 15))
+        if self.draw_downbar_field("reputacion", 300, 150, rep, dirty_regions):
+            if rep >= 70:
+                rep_color = (0, 200, 255)
+            elif rep >= 30:
+                rep_color = (255, 200, 0)
+            else:
+                rep_color = (255, 50, 50)
+            rep_text = text_cache.render_value("reputacion", self.font, f"Reputación: {rep}", rep_color)
+            self.screen.blit(rep_text, (300, constants.HEIGHT_SCREEN - hud_height + 15))
+            self.screen.set_clip(None)
         if tiempo_restante is not None:
             minutos = int(tiempo_restante) // 60
             segundos = int(tiempo_restante) % 60
-            timer_text = self.font.render(f"Tiempo: {minutos:02d}:{segundos:02d}", True, (255, 255, 255))
         else:
-            timer_text = self.font.render("Tiempo: 00:00", True, (255, 255, 255))
-        self.screen.blit(timer_text, (450, constants.HEIGHT_SCREEN - hud_height + 15))
-
-    def draw_resistencia(self, character):
-        hud_height = 55
-        try:
-            hud_y = self.screen.get_height() - hud_height
-        except Exception:
-            hud_y = constants.HEIGHT_SCREEN - hud_height
+            minutos, segundos = 0, 0
+        if self.draw_downbar_field("tiempo", 450, constants.WIDTH_SCREEN - 450, (minutos, segundos), dirty_regions):
+            timer_text = text_cache.render_value("tiempo", self.font, f"Tiempo: {minutos:02d}:{segundos:02d}", (255, 255, 255))
+            self.screen.blit(timer_text, (450, constants.HEIGHT_SCREEN - hud_height + 15))
+            self.screen.set_clip(None)
+
+    def draw_resistencia(self, character, dirty_regions=None):
+        hud_y = self.get_downbar_y()
         # Si la resistencia es 0 o menos, mostrar siempre stamina_0
         if character.resistencia == 0:
             sprite_index = 0
@@ -247,132 +338,186 @@ class UI:
             #si el stamina val es menor a 10 y mayor a 0, forzar a 1
             if sprite_index < 1:
                 sprite_index = 1
+        if not self.draw_downbar_field("resistencia", 0, 180, sprite_index, dirty_regions):
+            return
         sprite_path = f"sprites/stamina/stamina_{sprite_index}.png"
-        stamina_img = pygame.image.load(sprite_path).convert_alpha()
-        # Reducir el tamaño del sprite de stamina
-        stamina_img = pygame.transform.scale(stamina_img, (120, 40))
+        # Sprite de stamina reducido (cargado una sola vez en la caché de assets)
+        stamina_img = asset_manager.get_image(sprite_path, (120, 40))
         x, y = 40, hud_y + 5
         self.screen.blit(stamina_img, (x, y))
+        self.screen.set_clip(None)
+
+    def get_inventory_jobs(self, inventory, order=None):
+        """Devuelve los trabajos del inventario en el orden mostrado en el popup."""
+        if order == 'deadline':
+            return inventory.filter_by_deadline()
+        elif order == 'priority':
+            return inventory.filter_by_priority()
+        return inventory.jobs
 
-    def draw_inventory(self, inventory, order=None, tiempo_limite=None, selected_job_index=0):
+    def get_inventory_area(self, job_count):
+        """Área de pantalla que ocupa el popup de inventario (incluye la línea de ayuda bajo la lista)."""
+        popup_width = 600
+        popup_height = 400
+        popup_x = (constants.WIDTH_SCREEN - popup_width) // 2
+        popup_y = (constants.HEIGHT_SCREEN - popup_height) // 2
+        # Lista desde popup_y + 100, 28 px por trabajo y la ayuda 20 px debajo
+        content_height = 100 + 28 * job_count + 20 + 24
+        return pygame.Rect(popup_x, popup_y, popup_width, max(popup_height, content_height))
+
+    def get_inventory_row_text(self, job, tiempo_limite=None):
+        """Texto de la fila de un trabajo en el inventario, con el deadline mostrado como tiempo restante."""
+        # Calcular deadline mostrado como (tiempo_limite - deadline_job)
+        deadline_display = str(job.deadline)
+        # Si el deadline no se pudo leer, se muestra el valor original
+        if tiempo_limite is not None and job.deadline_seconds is not None:
+            restante = max(0, int(tiempo_limite) - job.deadline_seconds)
+            mm = restante // 60
+            ss = restante % 60
+            deadline_display = f"{mm:02d}:{ss:02d}"
+
+        # Mostrar todos los datos del trabajo junto al deadline calculado
+        return f"ID: {job.id} | Pago: ${job.payout} | Peso: {job.weight} | Prioridad: {job.priority} | Deadline: {deadline_display}"
+
+    def get_inventory_parts(self, inventory, order=None, tiempo_limite=None, selected_job_index=0):
+        """
+        Divide el popup de inventario en partes que se redibujan por separado: la ayuda al pie,
+        el encabezado (título y orden) y una fila por trabajo. Devuelve [(nombre, área, estado)].
+        """
+        jobs = self.get_inventory_jobs(inventory, order)
+        area = self.get_inventory_area(len(jobs))
+        rows_top = area.y + 98
+        rows_bottom = rows_top + 28 * len(jobs)
+        # El pie va primero: si se achica, el área que libera se restaura antes de revisar las filas
+        parts = [
+            ("inventory_footer", pygame.Rect(area.x, rows_bottom, area.width, area.bottom - rows_bottom), len(jobs)),
+            ("inventory_header", pygame.Rect(area.x, area.y, area.width, 98), order),
+        ]
+        for i, job in enumerate(jobs):
+            row_area = pygame.Rect(area.x, rows_top + 28 * i, area.width, 28)
+            state = (self.get_inventory_row_text(job, tiempo_limite), i == selected_job_index)
+            parts.append((f"inventory_row_{i}", row_area, state))
+        return parts
+
+    def inventory_needs_redraw(self, inventory, order=None, tiempo_limite=None, selected_job_index=0, dirty_regions=None):
+        """
+        Devuelve las áreas del popup de inventario que deben redibujarse este frame (y las marca
+        como sucias). Solo cambian las filas cuyo texto o selección cambió. Lista vacía si no hay nada.
+        """
+        parts = self.get_inventory_parts(inventory, order, tiempo_limite, selected_job_index)
+        return [area for name, area, state in parts if self.refresh_field(name, area, state, dirty_regions)]
+
+    def draw_inventory(self, inventory, order=None, tiempo_limite=None, selected_job_index=0, areas=None):
+        """Dibuja el popup de inventario; con areas solo redibuja esas partes (ver inventory_needs_redraw)."""
         # Dimensiones de la ventana pop-up
         popup_width = 600
         popup_height = 400
         popup_x = (constants.WIDTH_SCREEN - popup_width) // 2
         popup_y = (constants.HEIGHT_SCREEN - popup_height) // 2
+        chrome = self.get_popup_chrome("inventory")
 
-        popup_surface = pygame.Surface((popup_width, popup_height), pygame.SRCALPHA)
-        popup_surface.fill((0, 0, 0, 220))  # Negro con opacidad
-        self.screen.blit(popup_surface, (popup_x, popup_y))
-        # Título
-        title = self.font_inventory.render("Inventario de trabajos aceptados", True, (255,255,0))
-        self.screen.blit(title, (popup_x + 30, popup_y + 20))
+        if areas is None:
+            areas = [area for _, area, _ in self.get_inventory_parts(inventory, order, tiempo_limite, selected_job_index)]
+        jobs = self.get_inventory_jobs(inventory, order)
+        title = text_cache.render(self.font_inventory, "Inventario de trabajos aceptados", (255,255,0))
         # Orden
         if order == 'deadline':
-            jobs = inventory.filter_by_deadline()
-            order_text = self.font_inventory.render("Orden: Deadline (D)", True, (200,200,255))
+            order_text = text_cache.render(self.font_inventory, "Orden: Deadline (D)", (200,200,255))
         elif order == 'priority':
-            jobs = inventory.filter_by_priority()
-            order_text = self.font_inventory.render("Orden: Prioridad (P)", True, (200,255,200))
+            order_text = text_cache.render(self.font_inventory, "Orden: Prioridad (P)", (200,255,200))
         else:
-            jobs = inventory.jobs
-            order_text = self.font_inventory.render("Orden: Default", True, (180,180,180))
-        self.screen.blit(order_text, (popup_x + 30, popup_y + 60))
-
-        # Listado de trabajos
-        y = popup_y + 100
-        max_width = popup_width - 45
+            order_text = text_cache.render(self.font_inventory, "Orden: Default", (180,180,180))
         # Fuente un poco más grande para los trabajos
-        small_job_font = pygame.font.SysFont(None, 22)
-
-        for i, job in enumerate(jobs):
-            # Highlight selected job
-            if i == selected_job_index:
-                highlight_rect = pygame.Rect(popup_x + 25, y - 2, popup_width - 50, 26)
-                pygame.draw.rect(self.screen, (50, 50, 100), highlight_rect)
-
-            # Calcular deadline mostrado como (tiempo_limite - deadline_job)
-            deadline_display = str(job.deadline)
-            if tiempo_limite is not None:
-                try:
-                    time_part = str(job.deadline).split('T')[1] if 'T' in str(job.deadline) else str(job.deadline)
-                    mins = int(time_part.split(':')[0])
-                    secs = int(time_part.split(':')[1])
-                    deadline_secs = mins * 60 + secs
-                    restante = max(0, int(tiempo_limite) - deadline_secs)
-                    mm = restante // 60
-                    ss = restante % 60
-                    deadline_display = f"{mm:02d}:{ss:02d}"
-                except Exception:
-                    # Si falla el parseo, dejar el valor original
-                    deadline_display = str(job.deadline)
-
-            # Mostrar todos los datos del trabajo junto al deadline calculado
-            text_raw = f"ID: {job.id} | Pago: ${job.payout} | Peso: {job.weight} | Prioridad: {job.priority} | Deadline: {deadline_display}"
-            job_color = (255, 255, 0) if i == selected_job_index else (255, 255, 255)
-            job_text = small_job_font.render(text_raw, True, job_color)
-            self.screen.blit(job_text, (popup_x + 30, y))
-            y += 28  # Ajusta la separación para la nueva fuente
-
-        # Controles de navegación e información
-        info_text = self.font_inventory.render("↑↓: Navegar | D: Deadline | P: Prioridad | C: Cancelar trabajo | I: Cerrar", True, (255,200,100))
-        self.screen.blit(info_text, (popup_x + 20, y+20))
-
-    def draw_job_decision(self, pending_job, job_decision_message=None):
+        small_job_font = fonts.get(22)
+        info_text = text_cache.render(self.font_inventory, "↑↓: Navegar | D: Deadline | P: Prioridad | C: Cancelar trabajo | I: Cerrar", (255,200,100))
+
+        # Las partes no se solapan, así el fondo semitransparente se aplica una sola vez por pixel
+        for area in areas:
+            self.screen.set_clip(area)
+            self.screen.blit(chrome, area.topleft, area.move(-popup_x, -popup_y))
+            if area.y < popup_y + 98:
+                self.screen.blit(title, (popup_x + 30, popup_y + 20))
+                self.screen.blit(order_text, (popup_x + 30, popup_y + 60))
+
+            # Listado de trabajos
+            y = popup_y + 100
+            for i, job in enumerate(jobs):
+                if area.y <= y < area.bottom:
+                    # Highlight selected job
+                    if i == selected_job_index:
+                        highlight_rect = pygame.Rect(popup_x + 25, y - 2, popup_width - 50, 26)
+                        pygame.draw.rect(self.screen, (50, 50, 100), highlight_rect)
+                    job_color = (255, 255, 0) if i == selected_job_index else (255, 255, 255)
+                    job_text = text_cache.render(small_job_font, self.get_inventory_row_text(job, tiempo_limite), job_color)
+                    self.screen.blit(job_text, (popup_x + 30, y))
+                y += 28  # Ajusta la separación para la nueva fuente
+
+            # Controles de navegación e información
+            self.screen.blit(info_text, (popup_x + 20, y+20))
+        self.screen.set_clip(None)
+
+    def get_job_decision_rect(self):
+        """Recuadro del popup de decisión."""
         rect_width = 480
         rect_height = 110
         rect_x = (constants.WIDTH_SCREEN - rect_width) // 2
         rect_y = (constants.HEIGHT_SCREEN - rect_height) // 2 - 25
-        #Dibuja el sprite del HUD como fondo de la ventana de decisión
-        hud_decision_img = pygame.transform.scale(self.hud_img, (rect_width, rect_height))
-        self.screen.blit(hud_decision_img, (rect_x, rect_y))
+        return pygame.Rect(rect_x, rect_y, rect_width, rect_height)
+
+    def get_job_decision_area(self):
+        """Área de pantalla del popup de decisión (incluye la línea del mensaje bajo el recuadro)."""
+        message_area = pygame.Rect(0, constants.HEIGHT_SCREEN // 2 + 25, constants.WIDTH_SCREEN, 30)
+        return self.get_job_decision_rect().union(message_area)
+
+    def job_decision_needs_redraw(self, pending_job, job_decision_message=None, dirty_regions=None):
+        """True si el popup de decisión debe redibujarse este frame (y marca su área como sucia)."""
+        state = (pending_job.id if pending_job else None, job_decision_message)
+        return self.refresh_field("job_decision", self.get_job_decision_area(), state, dirty_regions)
+
+    def draw_job_decision(self, pending_job, job_decision_message=None):
+        rect = self.get_job_decision_rect()
         if not pending_job:
+            #Dibuja el sprite del HUD como fondo de la ventana de decisión
+            self.screen.blit(asset_manager.get_image("sprites/hud.png", rect.size), rect.topleft)
             return
-        font = pygame.font.SysFont(None, 22)
-        job_text = font.render(f"Pedido: {pending_job.id} | Pago: ${pending_job.payout} | Peso: {pending_job.weight} | Prioridad: {pending_job.priority}", True, (255,255,255))
-        rect = job_text.get_rect(center=(constants.WIDTH_SCREEN//2, constants.HEIGHT_SCREEN//2 - 40))
-        self.screen.blit(job_text, rect)
-        info_text = font.render("[A] Aceptar   [N] Rechazar", True, (0,0,0))
-        info_rect = info_text.get_rect(center=(constants.WIDTH_SCREEN//2, constants.HEIGHT_SCREEN//2))
-        self.screen.blit(info_text, info_rect)
+        # Fondo con la línea "[A] Aceptar   [N] Rechazar" ya compuesta
+        self.screen.blit(self.get_popup_chrome("job_decision"), rect.topleft)
+        font = fonts.get(22)
+        job_text = text_cache.render(font, f"Pedido: {pending_job.id} | Pago: ${pending_job.payout} | Peso: {pending_job.weight} | Prioridad: {pending_job.priority}", (255,255,255))
+        job_rect = job_text.get_rect(center=(constants.WIDTH_SCREEN//2, constants.HEIGHT_SCREEN//2 - 40))
+        self.screen.blit(job_text, job_rect)
         if job_decision_message:
-            msg_text = font.render(job_decision_message, True, (255,100,100))
+            msg_text = text_cache.render(font, job_decision_message, (255,100,100))
             msg_rect = msg_text.get_rect(center=(constants.WIDTH_SCREEN//2, constants.HEIGHT_SCREEN//2 + 40))
             self.screen.blit(msg_text, msg_rect)
 
-    def draw_difficulty_popup(self, options, selected_idx):
-        """Dibuja el popup de selección de dificultad. No maneja eventos, solo dibuja el estado actual.
-        options: lista de strings (etiquetas a mostrar).
-        selected_idx: índice seleccionado actualmente.
-        """
+    def get_difficulty_rect(self):
+        """Recuadro del popup de selección de dificultad."""
         popup_w = 480
         popup_h = 160
         popup_x = (constants.WIDTH_SCREEN - popup_w) // 2
         popup_y = (constants.HEIGHT_SCREEN - popup_h) // 2
+        return pygame.Rect(popup_x, popup_y, popup_w, popup_h)
 
-        hud_img = pygame.transform.scale(self.hud_img, (popup_w, popup_h))
-        self.screen.blit(hud_img, (popup_x, popup_y))
-
-        title_font = pygame.font.SysFont(None, 34)
-        title = title_font.render("Selecciona la dificultad de la AI", True, (255, 255, 0))
-        title_rect = title.get_rect(center=(constants.WIDTH_SCREEN // 2, popup_y + 28))
-        self.screen.blit(title, title_rect)
+    def draw_difficulty_popup(self, options, selected_idx):
+        """Dibuja el popup de selección de dificultad. No maneja eventos, solo dibuja el estado actual.
+        options: lista de strings (etiquetas a mostrar).
+        selected_idx: índice seleccionado actualmente.
+        """
+        popup = self.get_difficulty_rect()
+        # Fondo, título y ayuda ya compuestos; solo las opciones cambian con la selección
+        self.screen.blit(self.get_popup_chrome("difficulty"), popup.topleft)
 
-        opt_font = pygame.font.SysFont(None, 28)
+        opt_font = fonts.get(28)
         spacing = 140
         start_x = constants.WIDTH_SCREEN // 2 - spacing
-        y = popup_y + 80
+        y = popup.y + 80
         for i, opt in enumerate(options):
             color = (255, 255, 0) if i == selected_idx else (230, 230, 230)
-            text = opt_font.render(opt.capitalize(), True, color)
+            text = text_cache.render(opt_font, opt.capitalize(), color)
             text_rect = text.get_rect(center=(start_x + i * spacing, y))
             self.screen.blit(text, text_rect)
-
-        help_font = pygame.font.SysFont(None, 20)
-        help = help_font.render("← → : mover  | Enter: confirmar  | Esc: cancelar (medium por defecto)", True, (200, 200, 200))
-        help_rect = help.get_rect(center=(constants.WIDTH_SCREEN // 2, popup_y + popup_h - 20))
-        self.screen.blit(help, help_rect)
-        pygame.display.flip()
+        pygame.display.update(popup)
 
     def run_difficulty_selector(self, initial='medium'):
         """Muestra un selector modal para elegir la dificultad de la AI.
@@ -384,6 +529,14 @@ class UI:
         except Exception:
             selected_idx = 1
 
+        # Oscurecer el fondo una sola vez; el popup es opaco y se redibuja encima solo al cambiar la selección
+        overlay = pygame.Surface((constants.WIDTH_SCREEN, constants.HEIGHT_SCREEN), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        self.screen.blit(overlay, (0, 0))
+        self.draw_difficulty_popup(options, selected_idx)
+        pygame.display.flip()
+        drawn_idx = selected_idx
+
         clock = pygame.time.Clock()
         selecting = True
         while selecting:
@@ -406,45 +559,53 @@ class UI:
                     elif event.key == pygame.K_3:
                         return options[2]
 
-            # Dim the background
-            overlay = pygame.Surface((constants.WIDTH_SCREEN, constants.HEIGHT_SCREEN), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 160))
-            self.screen.blit(overlay, (0, 0))
-            self.draw_difficulty_popup(options, selected_idx)
+            if selected_idx != drawn_idx:
+                self.draw_difficulty_popup(options, selected_idx)
+                drawn_idx = selected_idx
             clock.tick(30)
 
-    def draw(self, character, tiempo_restante=None, money_objective=None, reputacion=None, weather= None, ai_character=None):
-        # --- Dibujar puntos de pickup y dropoff de los trabajos aceptados del jugador ---
-        for job in character.inventory.jobs:
-            # Solo mostrar pickup si no ha sido recogido
-            if not job.is_picked_up():
-                px, py = job.pickup
-                pickup_pos = (px * character.tile_size + character.tile_size // 2,
-                             py * character.tile_size + character.tile_size // 2 + constants.TOP_BAR_HEIGHT)
-                pygame.draw.circle(self.screen, (0, 120, 255), pickup_pos, character.tile_size // 3)
-            # Dropoff: naranja (si ya fue recogido)
-            if job.is_picked_up():
-                dx, dy = job.dropoff
-                dropoff_pos = (dx * character.tile_size + character.tile_size // 2,
-                              dy * character.tile_size + character.tile_size // 2 + constants.TOP_BAR_HEIGHT)
-                pygame.draw.circle(self.screen, (255, 140, 0), dropoff_pos, character.tile_size // 3)
-        
-        # --- Dibujar puntos de pickup y dropoff del AI character (para debug) ---
+    def get_job_markers(self, character, ai_character=None, camera=None):
+        """
+        Devuelve los marcadores de pickup/dropoff a dibujar como (posición, color, radio).
+        Con cámara, las posiciones son de pantalla y se omiten los que quedan fuera de la vista.
+        """
+        markers = []
+        couriers = [(character, (0, 120, 255), (255, 140, 0))]
+        # Puntos del AI character (para debug): pickup verde claro, dropoff magenta
         if ai_character:
-            for job in ai_character.inventory.jobs:
-                # Solo mostrar pickup si no ha sido recogido - Color verde claro
+            couriers.append((ai_character, (0, 255, 150), (255, 0, 255)))
+        for courier, pickup_color, dropoff_color in couriers:
+            tile_size = camera.tile_size if camera else courier.tile_size
+            for job in courier.inventory.jobs:
+                # Solo mostrar pickup si no ha sido recogido; dropoff si ya fue recogido
                 if not job.is_picked_up():
-                    px, py = job.pickup
-                    pickup_pos = (px * ai_character.tile_size + ai_character.tile_size // 2,
-                                 py * ai_character.tile_size + ai_character.tile_size // 2 + constants.TOP_BAR_HEIGHT)
-                    pygame.draw.circle(self.screen, (0, 255, 150), pickup_pos, ai_character.tile_size // 3)
-                # Dropoff: magenta (si ya fue recogido)
-                if job.is_picked_up():
-                    dx, dy = job.dropoff
-                    dropoff_pos = (dx * ai_character.tile_size + ai_character.tile_size // 2,
-                                  dy * ai_character.tile_size + ai_character.tile_size // 2 + constants.TOP_BAR_HEIGHT)
-                    pygame.draw.circle(self.screen, (255, 0, 255), dropoff_pos, ai_character.tile_size // 3)
-        
-        self.draw_topbar(character, money_objective, weather)
-        self.draw_downbar(character, tiempo_restante, reputacion)
-        self.draw_resistencia(character)
\ No newline at end of file
+                    tile, color = job.pickup, pickup_color
+                else:
+                    tile, color = job.dropoff, dropoff_color
+                if camera is None:
+                    pos = (tile[0] * tile_size + tile_size // 2,
+                           tile[1] * tile_size + tile_size // 2 + constants.TOP_BAR_HEIGHT)
+                elif camera.is_tile_visible(tile[0], tile[1]):
+                    pos = camera.tile_center_to_screen(tile[0], tile[1])
+                else:
+                    continue
+                markers.append((pos, color, tile_size // 3))
+        return markers
+
+    def get_marker_dirty_rects(self, character, ai_character=None, camera=None):
+        """Devuelve las regiones de los marcadores que aparecieron o desaparecieron desde el último frame."""
+        markers = self.get_job_markers(character, ai_character, camera)
+        changed = set(markers).symmetric_difference(self.drawn_markers)
+        self.drawn_markers = markers
+        return [pygame.Rect(x - radius - 1, y - radius - 1, 2 * radius + 2, 2 * radius + 2)
+                for (x, y), _, radius in changed]
+
+    def draw(self, character, tiempo_restante=None, money_objective=None, reputacion=None, weather= None, ai_character=None, dirty_regions=None, camera=None):
+        # --- Dibujar puntos de pickup y dropoff (jugador y AI) ---
+        markers = self.drawn_markers if dirty_regions is not None else self.get_job_markers(character, ai_character, camera)
+        for pos, color, radius in markers:
+            pygame.draw.circle(self.screen, color, pos, radius)
+
+        self.draw_topbar(character, money_objective, weather, dirty_regions)
+        self.draw_downbar(character, tiempo_restante, reputacion, dirty_regions)
+        self.draw_resistencia(character, dirty_regions)
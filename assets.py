@@ -0,0 +1,66 @@
+import os
+from collections import OrderedDict
+import pygame
+
+
+class AssetManager:
+    """
+    Caché compartida de imágenes ya decodificadas y escaladas, con clave (ruta, tamaño, alpha).
+    Cada PNG se lee y escala una sola vez y la misma superficie se reutiliza en Map, Character,
+    UI y MainMenu. Las entradas usadas hace más tiempo se descartan al superar max_entries.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_image(self, path, size=None, alpha=None):
+        """
+        Devuelve la imagen de la ruta escalada a size (ancho, alto) si se indica.
+        alpha=True usa convert_alpha(), alpha=False usa convert() y alpha=None lo decide
+        según la imagen: convert() si es completamente opaca (tiles), convert_alpha() si no.
+        Lanza las mismas excepciones que pygame.image.load si la imagen no se puede cargar.
+        """
+        key = (os.path.normpath(path), tuple(size) if size is not None else None, alpha)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+
+        self.misses += 1
+        image = pygame.image.load(path).convert_alpha()
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        if alpha is False or (alpha is None and self.is_opaque(image)):
+            image = image.convert()
+
+        self.images[key] = image
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+            self.evictions += 1
+        return image
+
+    def is_opaque(self, image):
+        """True si ningún pixel de la imagen tiene transparencia."""
+        width, height = image.get_size()
+        return pygame.mask.from_surface(image, 254).count() == width * height
+
+    def get_stats(self):
+        """Devuelve los aciertos, fallos, descartes y entradas actuales de la caché."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.images)
+        }
+
+    def clear(self):
+        """Vacía la caché (por ejemplo, si se recrea la ventana)."""
+        self.images.clear()
+
+
+# Instancia compartida por todo el juego
+asset_manager = AssetManager()
@@ -0,0 +1,90 @@
+import pygame
+import constants
+
+
+class Camera:
+    """
+    Vista del mapa que sigue al jugador. Solo los tiles y entidades que caen dentro de
+    la vista se dibujan, así el costo por frame no depende del tamaño de la ciudad.
+    Soporta varios niveles de zoom (constants.ZOOM_LEVELS) sobre el tamaño de tile base.
+    """
+    def __init__(self, map_width, map_height, base_tile_size, view_width, view_height, top=0, zoom_index=None):
+        self.map_width = map_width  # ancho del mapa en tiles
+        self.map_height = map_height  # alto del mapa en tiles
+        self.base_tile_size = base_tile_size
+        self.view = pygame.Rect(0, top, view_width, view_height)  # área de pantalla del mapa
+        self.zoom_levels = constants.ZOOM_LEVELS
+        self.zoom_index = zoom_index if zoom_index is not None else self.zoom_levels.index(1.0)
+        self.x = 0  # esquina superior izquierda de la vista, en píxeles del mapa
+        self.y = 0
+
+    @property
+    def tile_size(self):
+        """Tamaño de tile en píxeles para el zoom actual."""
+        return int(self.base_tile_size * self.zoom_levels[self.zoom_index])
+
+    @property
+    def zoom(self):
+        return self.zoom_levels[self.zoom_index]
+
+    def set_zoom(self, zoom_index):
+        """Cambia el nivel de zoom. Devuelve True si cambió."""
+        zoom_index = max(0, min(len(self.zoom_levels) - 1, zoom_index))
+        if zoom_index == self.zoom_index:
+            return False
+        self.zoom_index = zoom_index
+        return True
+
+    def zoom_in(self):
+        return self.set_zoom(self.zoom_index + 1)
+
+    def zoom_out(self):
+        return self.set_zoom(self.zoom_index - 1)
+
+    def follow(self, tile_x, tile_y):
+        """
+        Centra la vista en el tile dado sin salirse del mapa.
+        Devuelve True si la vista se desplazó (hay que redibujar todo).
+        """
+        tile_size = self.tile_size
+        map_px_w = self.map_width * tile_size
+        map_px_h = self.map_height * tile_size
+        # Si el mapa cabe en la vista se queda anclado arriba a la izquierda
+        new_x = tile_x * tile_size + tile_size // 2 - self.view.width // 2
+        new_y = tile_y * tile_size + tile_size // 2 - self.view.height // 2
+        new_x = max(0, min(new_x, map_px_w - self.view.width))
+        new_y = max(0, min(new_y, map_px_h - self.view.height))
+        if (new_x, new_y) == (self.x, self.y):
+            return False
+        self.x, self.y = new_x, new_y
+        return True
+
+    def visible_tile_range(self):
+        """Devuelve (x0, y0, x1, y1): rango de tiles visibles, con x1/y1 exclusivos."""
+        tile_size = self.tile_size
+        x0 = self.x // tile_size
+        y0 = self.y // tile_size
+        x1 = min(self.map_width, (self.x + self.view.width + tile_size - 1) // tile_size)
+        y1 = min(self.map_height, (self.y + self.view.height + tile_size - 1) // tile_size)
+        return x0, y0, x1, y1
+
+    def world_to_screen(self, px, py):
+        """Convierte píxeles del mapa (al zoom actual) a coordenadas de pantalla."""
+        return px - self.x + self.view.x, py - self.y + self.view.y
+
+    def tile_to_screen(self, tile_x, tile_y):
+        """Esquina superior izquierda del tile en pantalla."""
+        return self.world_to_screen(tile_x * self.tile_size, tile_y * self.tile_size)
+
+    def tile_center_to_screen(self, tile_x, tile_y):
+        """Centro del tile en pantalla."""
+        half = self.tile_size // 2
+        return self.world_to_screen(tile_x * self.tile_size + half, tile_y * self.tile_size + half)
+
+    def is_tile_visible(self, tile_x, tile_y):
+        x0, y0, x1, y1 = self.visible_tile_range()
+        return x0 <= tile_x < x1 and y0 <= tile_y < y1
+
+    def is_visible(self, rect):
+        """True si el rectángulo de pantalla se cruza con la vista del mapa."""
+        return self.view.colliderect(rect)
@@ -2,18 +2,22 @@ import pygame  # Librería para gráficos y eventos
 import constants  # Constantes globales del juego
 from job import Job  # Clase para trabajos
 from inventory import Inventory  # Clase para el inventario
+from assets import asset_manager  # Caché compartida de sprites
 import os
 
 
 
 class Character:
-    def __init__(self, tile_x, tile_y, tile_size, screen, top_bar_height=None):
+    def __init__(self, tile_x, tile_y, tile_size, screen, top_bar_height=None, load_sprites=True, clock=None):
         """
         Inicializa el personaje en la posición (tile_x, tile_y) con el tamaño de tile dado.
         screen: superficie de pygame donde se dibuja
         top_bar_height: altura de la barra superior (HUD)
+        load_sprites: False en la simulación sin pantalla (no se cargan imágenes)
+        clock: función que devuelve el tiempo actual en ms (por defecto pygame.time.get_ticks)
         """
         self.screen = screen  # Superficie de dibujo
+        self.clock = clock if clock is not None else pygame.time.get_ticks
         self.tile_x = tile_x  # Posición X en tiles
         self.tile_y = tile_y  # Posición Y en tiles
         self.reputation = 70  # Reputación inicial (punto 7)
@@ -42,7 +46,12 @@ class Character:
 
         # Dirección actual para dibujar el sprite del personaje
         self.facing = "down"  # down | up | left | right
-        self.character_sprites = self.load_character_sprites()
+        self.character_sprites = self.load_character_sprites() if load_sprites else {}
+        # Sprites escalados por tamaño (uno por nivel de zoom de la cámara)
+        self.sprite_sets = {(constants.WIDTH_CHARACTER, constants.HEIGHT_CHARACTER): self.character_sprites}
+        # Último rectángulo y dirección dibujados (para el redibujo por regiones sucias)
+        self.drawn_rect = None
+        self.drawn_facing = None
 
 
     # --- Lógica de reputación y penalizaciones ---
@@ -137,6 +146,25 @@ class Character:
             self.score += job.payout
         return delivered
 
+    def complete_delivery(self, job, elapsed_seconds):
+        """
+        Aplica la reputación según el deadline y suma el pago de un trabajo ya entregado.
+        elapsed_seconds: segundos de juego transcurridos al momento de la entrega.
+        """
+        deadline_seconds = job.deadline_seconds
+        if deadline_seconds is None:
+            # Deadline ilegible: se cuenta como entrega a tiempo
+            self.job_delivered_in_time_reputation()
+        elif elapsed_seconds <= deadline_seconds - int(0.2 * deadline_seconds):
+            self.job_delivered_early_reputation()
+        elif elapsed_seconds <= deadline_seconds:
+            self.job_delivered_in_time_reputation()
+        else:
+            segundos_tarde = elapsed_seconds - deadline_seconds
+            self.job_delivered_late_reputacion(segundos_tarde)
+        payout = int(job.payout * self.pay_multiplier_reputation())
+        self.score += payout
+
     def update_stats(self):
         """
         Actualiza el peso total de trabajos recogidos usando el inventario.
@@ -149,31 +177,67 @@ class Character:
         """Suma una cantidad a la puntuación."""
         self.score += payout
 
-    def draw(self, screen):
+    def get_screen_rect(self, camera=None):
+        """Rectángulo del personaje en pantalla; con cámara se ubica y escala según la vista."""
+        if camera is None:
+            return self.shape.copy()
+        rect = pygame.Rect(0, 0, int(constants.WIDTH_CHARACTER * camera.zoom), int(constants.HEIGHT_CHARACTER * camera.zoom))
+        rect.center = camera.tile_center_to_screen(self.tile_x, self.tile_y)
+        return rect
+
+    def get_sprites(self, size):
+        """Devuelve los sprites direccionales escalados al tamaño dado (se escalan una sola vez)."""
+        if size not in self.sprite_sets:
+            self.sprite_sets[size] = self.load_character_sprites(size)
+        return self.sprite_sets[size]
+
+    def prepare_zoom_levels(self, zoom_levels):
+        """Pre-escala los sprites para todos los niveles de zoom."""
+        for zoom in zoom_levels:
+            self.get_sprites((int(constants.WIDTH_CHARACTER * zoom), int(constants.HEIGHT_CHARACTER * zoom)))
+
+    def draw(self, screen, camera=None):
         """Dibuja el personaje en la pantalla con sprite direccional si está disponible."""
+        rect = self.get_screen_rect(camera)
+        if camera is not None and not camera.is_visible(rect):
+            # Fuera de la vista: no se dibuja
+            self.drawn_rect = rect
+            self.drawn_facing = self.facing
+            return
         sprite = None
         if hasattr(self, 'character_sprites') and self.character_sprites:
-            sprite = self.character_sprites.get(self.facing)
+            sprite = self.get_sprites(rect.size).get(self.facing)
         if sprite:
-            screen.blit(sprite, self.shape.topleft)
+            screen.blit(sprite, rect.topleft)
         else:
-            pygame.draw.rect(screen, constants.COLOR_CHARACTER, self.shape)
+            pygame.draw.rect(screen, constants.COLOR_CHARACTER, rect)
+        self.drawn_rect = rect
+        self.drawn_facing = self.facing
+
+    def get_dirty_rects(self, camera=None):
+        """
+        Devuelve las regiones de pantalla que cambiaron desde el último draw:
+        la posición anterior y la nueva si el personaje se movió o giró.
+        """
+        rect = self.get_screen_rect(camera)
+        if self.drawn_rect is None:
+            return [rect]
+        if self.drawn_rect == rect and self.drawn_facing == self.facing:
+            return []
+        return [self.drawn_rect.copy(), rect]
 
     def restore_stamina(self, segundos=1):
         """
         Recupera resistencia automáticamente cuando el personaje está inactivo.
         """
-        time = pygame.time.get_ticks()
+        time = self.clock()
         # Solo recuperar si ha pasado tiempo suficiente desde el último movimiento Y no está exhausto
         if time - self.last_movement >= self.delay_recuperacion:
             # Recuperar resistencia gradualmente
             recovery_rate = 5  # puntos por segundo de recuperación
             self.resistencia = min(100, self.resistencia + recovery_rate * segundos)
-            # Debug: mostrar recuperación solo cuando realmente sucede
             if self.resistencia >= 30:
                 self.resistencia_exhausto = False
-            if recovery_rate * segundos > 0:
-                print(f"Recuperando resistencia: {self.resistencia}")
 
     def update_stamina(self, mapa=None, stamina=1.0):
         """
@@ -244,8 +308,7 @@ class Character:
 
             # Actualiza resistencia y timestamp de movimiento
             self.update_stamina(mapa, velocidad)
-            self.last_movement = pygame.time.get_ticks()
-            print(self.resistencia)
+            self.last_movement = self.clock()
 
     def get_score(self):
         """Devuelve la puntuación actual del jugador."""
@@ -307,8 +370,9 @@ class Character:
         }
 
     # --- Carga de sprites del personaje ---
-    def load_character_sprites(self):
+    def load_character_sprites(self, size=None):
         """Carga sprites direccionales del personaje desde sprites/character/."""
+        size = size or (constants.WIDTH_CHARACTER, constants.HEIGHT_CHARACTER)
         base = os.path.join("sprites", "character")
         mapping = {
             "up": "up_character.png",
@@ -321,9 +385,7 @@ class Character:
             path = os.path.join(base, filename)
             if os.path.exists(path):
                 try:
-                    img = pygame.image.load(path).convert_alpha()
-                    img = pygame.transform.scale(img, (constants.WIDTH_CHARACTER, constants.HEIGHT_CHARACTER))
-                    sprites[key] = img
+                    sprites[key] = asset_manager.get_image(path, size)
                 except Exception as e:
                     print(f"Error loading character sprite {filename}: {e}")
             else:
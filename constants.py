@@ -6,4 +6,11 @@ MAX_WEIGHT = 10
 COLOR_CHARACTER = (0, 0, 255)
 COLOR_BACKGROUND = (0, 0, 0)
 FPS = 60
-TOP_BAR_HEIGHT = 55
\ No newline at end of file
+TOP_BAR_HEIGHT = 55
+BOTTOM_BAR_HEIGHT = 55
+ZOOM_LEVELS = (0.5, 1.0, 1.5, 2.0)
+# Lógica del juego en pasos fijos, independiente de la tasa de dibujado
+SIMULATION_STEP_MS = 1000 / 60
+MAX_SIMULATION_STEPS = 15  # pasos máximos por frame antes de descartar el atraso
+# Presupuesto por decisión (ms) de la búsqueda iterativa del AI medio
+AI_SEARCH_BUDGET_MS = 4
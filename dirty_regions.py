@@ -0,0 +1,39 @@
+import pygame
+
+
+class DirtyRegions:
+    """
+    Registra las regiones de la pantalla que cambiaron durante el frame actual.
+    Al presentar el frame solo se envían esas regiones con pygame.display.update(rects);
+    en un cambio de escena se marca un redibujo completo y se usa pygame.display.flip().
+    """
+    def __init__(self):
+        self.rects = []
+        self.full_redraw = True  # El primer frame siempre se dibuja completo
+
+    def mark(self, rect):
+        """Marca un rectángulo de la pantalla como modificado."""
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self, rects):
+        """Marca una lista de rectángulos como modificados."""
+        for rect in rects:
+            self.mark(rect)
+
+    def mark_full(self):
+        """Fuerza a redibujar y presentar la pantalla completa (cambio de escena)."""
+        self.full_redraw = True
+
+    def collides(self, rect):
+        """True si el rectángulo toca alguna región ya marcada en este frame."""
+        return self.full_redraw or rect.collidelist(self.rects) != -1
+
+    def present(self):
+        """Presenta el frame y limpia las regiones para el siguiente."""
+        if self.full_redraw:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full_redraw = False
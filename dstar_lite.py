@@ -0,0 +1,152 @@
+import heapq
+from itertools import count
+
+INF = float("inf")
+
+
+class DStarLite:
+    """
+    D* Lite sobre el grafo de un GridPathfinder: camino de menor costo hacia un destino fijo que
+    se repara cuando el grafo cambia (cierres y reaperturas de calles) o el personaje avanza.
+
+    La búsqueda va del destino hacia el inicio: g[u] es el costo de u al destino y rhs[u] su
+    valor según los sucesores (costo de entrar al sucesor más su g). Al cambiar unos tiles solo
+    se recalculan los nodos cuyo costo realmente cambió, reutilizando el resto de la búsqueda
+    anterior; así el costo de replanificar depende de lo que cambió y no del tamaño del mapa.
+    km acumula cuánto avanzó el inicio para no reordenar la cola cuando el personaje se mueve.
+    """
+    def __init__(self, pathfinder, start, goal):
+        self.pathfinder = pathfinder
+        self.width = pathfinder.width
+        self.goal = goal
+        width = self.width
+        self.goal_index = goal[1] * width + goal[0]
+        self.start_index = start[1] * width + start[0]
+        self.last_start = self.start_index
+        self.km = 0.0
+        self.g = {}
+        self.rhs = {self.goal_index: 0.0}
+        self.queue = []  # heap de (clave, orden de inserción, índice)
+        self.queued = {}  # clave vigente de cada índice en la cola (las demás entradas se ignoran)
+        self.counter = count()
+        self.expanded = 0  # nodos expandidos en total, para medir cuánto cuesta cada reparación
+        self.push(self.goal_index)
+
+    def heuristic(self, a, b):
+        """Manhattan entre dos índices por el costo mínimo de un paso (admisible y consistente)."""
+        width = self.width
+        return (abs(a % width - b % width) + abs(a // width - b // width)) * self.pathfinder.min_step_cost
+
+    def calculate_key(self, u):
+        best = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (best + self.heuristic(self.start_index, u) + self.km, best)
+
+    def push(self, u):
+        key = self.calculate_key(u)
+        self.queued[u] = key
+        heapq.heappush(self.queue, (key, next(self.counter), u))
+
+    def top_key(self):
+        """Clave del primer nodo vigente de la cola (descarta las entradas viejas)."""
+        queue = self.queue
+        while queue:
+            key, _, u = queue[0]
+            if self.queued.get(u) == key:
+                return key
+            heapq.heappop(queue)
+        return (INF, INF)
+
+    def update_vertex(self, u):
+        if u != self.goal_index:
+            best = INF
+            pathfinder = self.pathfinder
+            nodes = pathfinder.node_grid
+            if nodes[u]:
+                enter_cost = pathfinder.enter_cost
+                g = self.g
+                for s in pathfinder.neighbor_indices(u):
+                    if nodes[s]:
+                        cost = enter_cost[s] + g.get(s, INF)
+                        if cost < best:
+                            best = cost
+            self.rhs[u] = best
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self.push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def compute_shortest_path(self):
+        g, rhs = self.g, self.rhs
+        neighbor_indices = self.pathfinder.neighbor_indices
+        start = self.start_index
+        while True:
+            k_old = self.top_key()
+            if not (k_old < self.calculate_key(start) or rhs.get(start, INF) > g.get(start, INF)):
+                break
+            _, _, u = heapq.heappop(self.queue)
+            del self.queued[u]
+            self.expanded += 1
+            k_new = self.calculate_key(u)
+            if k_old < k_new:
+                self.push(u)
+            elif g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for p in neighbor_indices(u):
+                    self.update_vertex(p)
+            else:
+                g[u] = INF
+                self.update_vertex(u)
+                for p in neighbor_indices(u):
+                    self.update_vertex(p)
+
+    def move_start(self, start):
+        """El personaje avanzó hasta start: ajusta km en vez de reordenar la cola."""
+        index = start[1] * self.width + start[0]
+        if index != self.start_index:
+            self.km += self.heuristic(self.last_start, index)
+            self.last_start = index
+            self.start_index = index
+
+    def update_tiles(self, indices):
+        """
+        Repara la búsqueda después de que cambiaron el costo o la condición de nodo de los índices
+        dados (lo que devuelve GridPathfinder.update_tiles): se recalculan ellos y sus vecinos,
+        que son los nodos con alguna arista hacia ellos.
+        """
+        affected = set(indices)
+        for index in indices:
+            affected.update(self.pathfinder.neighbor_indices(index))
+        for u in affected:
+            self.update_vertex(u)
+
+    def find_path(self, start):
+        """
+        Camino [(x, y), ...] de start al destino con los costos actuales, o None si no hay camino.
+        Cada paso va al vecino que minimiza costo de entrar + g (en orden arriba, abajo, izquierda, derecha).
+        """
+        self.move_start(start)
+        self.compute_shortest_path()
+        pathfinder = self.pathfinder
+        nodes = pathfinder.node_grid
+        u = self.start_index
+        # Al terminar la búsqueda rhs del inicio es su costo al destino (g puede seguir sin actualizar)
+        if not nodes[u] or self.rhs.get(u, INF) == INF:
+            return None
+        width = self.width
+        enter_cost = pathfinder.enter_cost
+        g = self.g
+        path = [start]
+        visited = {u}
+        while u != self.goal_index:
+            best, best_cost = None, INF
+            for s in pathfinder.neighbor_indices(u):
+                if nodes[s]:
+                    cost = enter_cost[s] + g.get(s, INF)
+                    if cost < best_cost:
+                        best, best_cost = s, cost
+            if best is None or best in visited:
+                return None
+            visited.add(best)
+            path.append((best % width, best // width))
+            u = best
+        return path
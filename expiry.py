@@ -0,0 +1,57 @@
+import heapq
+from itertools import count
+
+
+class ExpiryScheduler:
+    """
+    Vencimiento de trabajos por deadline: un min-heap de (deadline en segundos, trabajo) con los
+    trabajos de varias fuentes (inventarios, trabajos visibles). En cada tick se sacan del heap
+    exactamente los trabajos vencidos, todos en el mismo tick, en O(k log n); mientras ninguno
+    vence no se recorre ninguna lista.
+
+    Cada fuente se registra con watch: cómo leer sus trabajos, su versión y un trabajo por id.
+    Los trabajos nuevos se agregan al heap solo cuando cambia la versión de la fuente. Los que
+    salieron de la fuente antes de vencer quedan en el heap y se descartan al llegar al frente.
+    """
+    def __init__(self):
+        self.heap = []  # (deadline_seconds, orden de inserción, fuente, trabajo)
+        self.sources = {}  # {fuente: [get_jobs, get_version, get_job, última versión revisada]}
+        self.scheduled = set()  # (fuente, id(trabajo)) de los trabajos que ya están en el heap
+        self.counter = count()
+
+    def watch(self, name, get_jobs, get_version, get_job):
+        """
+        Registra una fuente. get_jobs() devuelve sus trabajos, get_version() un valor que cambia
+        cuando cambian y get_job(job_id) el trabajo con ese id (o None si ya no está).
+        """
+        self.sources[name] = [get_jobs, get_version, get_job, None]
+
+    def sync(self):
+        """Agrega al heap los trabajos nuevos de las fuentes que cambiaron desde la última revisión."""
+        for name, source in self.sources.items():
+            get_jobs, get_version, _, seen_version = source
+            version = get_version()
+            if version == seen_version:
+                continue
+            source[3] = version
+            for job in get_jobs():
+                key = (name, id(job))
+                if key in self.scheduled or job.deadline_seconds is None:
+                    continue
+                self.scheduled.add(key)
+                heapq.heappush(self.heap, (job.deadline_seconds, next(self.counter), name, job))
+
+    def pop_expired(self, elapsed_seconds):
+        """
+        Saca del heap los trabajos con deadline menor a elapsed_seconds (como Job.is_expired) y
+        devuelve [(fuente, trabajo)] de los que siguen en su fuente, en orden de deadline.
+        """
+        self.sync()
+        heap = self.heap
+        expired = []
+        while heap and heap[0][0] < elapsed_seconds:
+            _, _, name, job = heapq.heappop(heap)
+            self.scheduled.discard((name, id(job)))
+            if self.sources[name][2](job.id) is job:
+                expired.append((name, job))
+        return expired
@@ -0,0 +1,87 @@
+from array import array
+from collections import OrderedDict
+
+# Cantidad de campos guardados; se descarta el usado hace más tiempo
+DEFAULT_FLOW_FIELD_CAPACITY = 32
+
+
+class FlowField:
+    """
+    Campo de flujo hacia un tile destino: una búsqueda inversa completa desde el destino deja, para
+    cada tile del mapa, su costo al destino y el siguiente paso de un camino óptimo. Cualquier
+    personaje, esté donde esté, obtiene su próximo movimiento leyendo un elemento del array.
+    """
+    def __init__(self, pathfinder, goal):
+        self.goal = goal
+        self.width = pathfinder.width
+        self.height = pathfinder.height
+        size = self.width * self.height
+        self.next_step = array("l", [-1]) * size  # índice del siguiente tile, -1 si no hay paso
+        if pathfinder.has_node(goal):
+            self.cost = pathfinder.distance_field(goal[1] * self.width + goal[0], reverse=True,
+                                                  parents=self.next_step)
+        else:
+            self.cost = array("d", [float("inf")]) * size
+
+    def cost_from(self, position):
+        """Costo del camino más barato de position al destino, o None si no hay camino."""
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        cost = self.cost[y * self.width + x]
+        return cost if cost < float("inf") else None
+
+    def next_move(self, position):
+        """Movimiento (dx, dy) del siguiente paso óptimo desde position; (0, 0) si no hay o ya llegó."""
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return (0, 0)
+        step = self.next_step[y * self.width + x]
+        if step < 0:
+            return (0, 0)
+        return (step % self.width - x, step // self.width - y)
+
+    def path_from(self, position):
+        """Camino [(x, y), ...] de position al destino siguiendo el campo, o None si no hay camino."""
+        if self.cost_from(position) is None:
+            return None
+        width = self.width
+        index = position[1] * width + position[0]
+        path = [position]
+        while self.next_step[index] >= 0:
+            index = self.next_step[index]
+            path.append((index % width, index // width))
+        return path
+
+
+class FlowFieldCache:
+    """
+    Campos de flujo por tile destino con descarte LRU. Varios AIController pueden compartir la
+    misma caché: los que van al mismo destino usan un solo campo. Todos los campos se descartan
+    cuando cambia el contexto (modificador de clima o versión de cierres de calles del mapa).
+    """
+    def __init__(self, capacity=DEFAULT_FLOW_FIELD_CAPACITY):
+        self.capacity = capacity
+        self.fields = OrderedDict()
+        self.context = None
+        self.hits = 0
+        self.misses = 0
+
+    def set_context(self, context):
+        """Descarta los campos si se calcularon con otro clima u otros cierres de calles."""
+        if context != self.context:
+            self.fields.clear()
+            self.context = context
+
+    def get(self, pathfinder, goal):
+        field = self.fields.get(goal)
+        if field is not None:
+            self.fields.move_to_end(goal)
+            self.hits += 1
+            return field
+        self.misses += 1
+        field = FlowField(pathfinder, goal)
+        self.fields[goal] = field
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+import pygame
+
+# Tamaños de la fuente por defecto que usan UI y MainMenu (se cargan al iniciar)
+FONT_SIZES = (20, 22, 24, 26, 28, 30, 32, 34, 40, 48, 60)
+
+
+class FontRegistry:
+    """
+    Registro de fuentes creado al iniciar el juego. pygame.font.SysFont recorre las fuentes
+    del sistema en cada llamada, así que cada (nombre, tamaño) se crea una sola vez.
+    """
+    def __init__(self):
+        self.fonts = {}
+
+    def load(self, sizes=FONT_SIZES, name=None):
+        """Crea de antemano las fuentes de los tamaños indicados."""
+        for size in sizes:
+            self.get(size, name)
+
+    def get(self, size, name=None):
+        """Devuelve la fuente (nombre, tamaño), creándola la primera vez."""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    """
+    Caché LRU de textos ya renderizados con clave (fuente, texto, color, antialias).
+    Los textos fijos (menús, ayudas, títulos) se renderizan una sola vez. Los valores que
+    cambian seguido (puntaje, tiempo) usan render_value, que guarda una sola superficie
+    por campo y solo vuelve a renderizar cuando el texto cambia.
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Equivalente a font.render(text, antialias, color), pero cacheado."""
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render_value(self, field, font, text, color, antialias=True):
+        """
+        Renderiza el texto de un campo dinámico (por ejemplo "tiempo"). Solo se vuelve a
+        renderizar si el texto o su estilo cambió desde la última vez.
+        """
+        key = (font, text, tuple(color), antialias)
+        cached = self.values.get(field)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.values[field] = (key, surface)
+        return surface
+
+    def get_stats(self):
+        """Devuelve los aciertos, fallos y entradas actuales de la caché."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.surfaces),
+            "fields": len(self.values)
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.values.clear()
+
+
+# Instancias compartidas por todo el juego
+fonts = FontRegistry()
+text_cache = TextCache()
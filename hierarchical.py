@@ -0,0 +1,325 @@
+import heapq
+from itertools import count
+
+# Lado (en tiles) de cada cluster de la abstracción
+DEFAULT_CLUSTER_SIZE = 16
+# Entradas de al menos este largo tienen puntos de transición en ambos extremos y cada
+# LONG_ENTRANCE tiles entre ellos; las más cortas, uno solo en el medio
+LONG_ENTRANCE = 6
+
+_GOAL = -1  # nodo abstracto temporal del destino durante una búsqueda
+
+
+class HierarchicalPathfinder:
+    """
+    HPA* (Hierarchical Path-Finding A*) sobre el grafo de un GridPathfinder, para mapas muy grandes.
+
+    - El mapa se divide en clusters de cluster_size x cluster_size tiles.
+    - En cada borde entre dos clusters, cada tramo continuo de tiles cruzables es una entrada con
+      uno o más puntos de transición: un par de tiles vecinos, uno a cada lado del borde.
+    - Los nodos abstractos son los tiles de transición. Las aristas son los cruces de borde (costo de
+      entrar al tile del otro lado) y los caminos dentro de un cluster entre sus tiles de transición
+      (costo de una búsqueda que no sale del cluster). Estas últimas dependen del clima y se
+      calculan la primera vez que la búsqueda entra al cluster con ese modificador.
+
+    Una consulta conecta el inicio y el destino a las transiciones de su cluster, busca con A* sobre
+    el grafo abstracto (mucho más chico que el mapa) y devuelve la secuencia de tiles abstractos.
+    refine_segment convierte un tramo en tiles reales, así el camino se refina un cluster a la vez
+    mientras el personaje avanza. El costo es el de un camino real, pero puede ser algo mayor que
+    el óptimo porque solo se cruza entre clusters por los puntos de transición.
+    """
+    def __init__(self, pathfinder, cluster_size=DEFAULT_CLUSTER_SIZE):
+        self.pathfinder = pathfinder
+        self.width = pathfinder.width
+        self.height = pathfinder.height
+        self.cluster_size = cluster_size
+        self.clusters_x = (self.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (self.height + cluster_size - 1) // cluster_size
+        self.borders = {}  # {(cluster, cluster de la derecha o de abajo): [(tile, tile del otro lado)]}
+        self.entrances = {}  # {cluster: [índices de tiles de transición]}
+        self.inter_edges = {}  # {tile de transición: [tile vecino del otro lado del borde]}
+        self.intra_edges = {}  # {(modificador de clima, cluster): {tile: [(tile, costo)]}}
+        self.build_entrances()
+
+    def cluster_of(self, index):
+        size = self.cluster_size
+        return (index // self.width // size) * self.clusters_x + (index % self.width) // size
+
+    def cluster_bounds(self, cluster):
+        """(x0, y0, x1, y1) del cluster, con x1 e y1 exclusivos."""
+        size = self.cluster_size
+        x0 = (cluster % self.clusters_x) * size
+        y0 = (cluster // self.clusters_x) * size
+        return x0, y0, min(x0 + size, self.width), min(y0 + size, self.height)
+
+    def cluster_borders(self, cluster):
+        """Bordes del cluster como (cluster de la izquierda o de arriba, cluster de la derecha o de abajo)."""
+        clusters_x = self.clusters_x
+        cluster_x, cluster_y = cluster % clusters_x, cluster // clusters_x
+        borders = []
+        if cluster_x + 1 < clusters_x:
+            borders.append((cluster, cluster + 1))
+        if cluster_y + 1 < self.clusters_y:
+            borders.append((cluster, cluster + clusters_x))
+        if cluster_x > 0:
+            borders.append((cluster - 1, cluster))
+        if cluster_y > 0:
+            borders.append((cluster - clusters_x, cluster))
+        return borders
+
+    def border_pairs(self, border):
+        """Pares de tiles vecinos a ambos lados del borde: (tile del primer cluster, tile del segundo)."""
+        first, second = border
+        width = self.width
+        x0, y0, x1, y1 = self.cluster_bounds(first)
+        if second == first + self.clusters_x:
+            # Borde horizontal: última fila del primer cluster y la siguiente
+            return [((y1 - 1) * width + x, y1 * width + x) for x in range(x0, x1)]
+        # Borde vertical: última columna del primer cluster y la siguiente
+        return [(y * width + x1 - 1, y * width + x1) for y in range(y0, y1)]
+
+    def build_entrances(self):
+        """Recorre los bordes entre clusters y crea los puntos de transición de cada entrada."""
+        cluster_count = self.clusters_x * self.clusters_y
+        for cluster in range(cluster_count):
+            for border in self.cluster_borders(cluster):
+                if border[0] == cluster:
+                    self.borders[border] = self.find_transitions(self.border_pairs(border))
+        for cluster in range(cluster_count):
+            self.index_cluster(cluster)
+
+    def find_transitions(self, pairs):
+        """
+        Divide un borde en tramos de pares accesibles y devuelve sus puntos de transición. Un tile
+        bloqueado es un destino (edificio), no parte de la calle: no forma tramos, pero si solo se
+        llega a él desde el cluster vecino, su cruce es un punto de transición propio.
+        """
+        nodes = self.pathfinder.node_grid
+        blocked = self.pathfinder.blocked_grid
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and not blocked[a] and not blocked[b]:
+                run.append((a, b))
+                continue
+            if a is not None and nodes[a] and nodes[b] and blocked[a] != blocked[b]:
+                building = a if blocked[a] else b
+                if not self.has_street_inside(building, blocked):
+                    transitions.append((a, b))
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    transitions.extend(run[:-1:LONG_ENTRANCE] + [run[-1]])
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        return transitions
+
+    def has_street_inside(self, index, blocked):
+        """True si el tile tiene algún vecino accesible dentro de su propio cluster."""
+        x0, y0, x1, y1 = self.cluster_bounds(self.cluster_of(index))
+        y, x = divmod(index, self.width)
+        return ((y > y0 and not blocked[index - self.width]) or
+                (y + 1 < y1 and not blocked[index + self.width]) or
+                (x > x0 and not blocked[index - 1]) or
+                (x + 1 < x1 and not blocked[index + 1]))
+
+    def index_cluster(self, cluster):
+        """Arma la lista de transiciones del cluster y sus cruces de borde a partir de sus bordes."""
+        for tile in self.entrances.pop(cluster, ()):
+            self.inter_edges.pop(tile, None)
+        entrances = []
+        for border in self.cluster_borders(cluster):
+            for a, b in self.borders[border]:
+                tile, other = (a, b) if border[0] == cluster else (b, a)
+                if tile not in entrances:
+                    entrances.append(tile)
+                self.inter_edges.setdefault(tile, []).append(other)
+        if entrances:
+            self.entrances[cluster] = entrances
+
+    def update_tiles(self, indices):
+        """
+        Actualiza la abstracción después de cerrar o reabrir tiles (los índices que devuelve
+        GridPathfinder.update_tiles): rehace solo los bordes de los clusters con tiles cambiados y
+        descarta los costos internos ya calculados de esos clusters y de sus vecinos por bordes que cambiaron.
+        """
+        clusters = {self.cluster_of(index) for index in indices}
+        stale = set(clusters)
+        for cluster in clusters:
+            for border in self.cluster_borders(cluster):
+                transitions = self.find_transitions(self.border_pairs(border))
+                if transitions != self.borders[border]:
+                    self.borders[border] = transitions
+                    stale.update(border)
+        for cluster in stale:
+            self.index_cluster(cluster)
+        for key in [key for key in self.intra_edges if key[1] in stale]:
+            del self.intra_edges[key]
+
+    def cluster_search(self, source, cluster, targets=None, reverse=False):
+        """
+        Dijkstra desde el índice source sin salir del cluster. Con targets se detiene al asentarlos
+        todos. Con reverse=True calcula el costo de cada tile hasta source. Devuelve (distancias, padres).
+        """
+        pathfinder = self.pathfinder
+        width = self.width
+        enter_cost = pathfinder.enter_cost
+        nodes = pathfinder.node_grid
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        remaining = set(targets) if targets is not None else None
+        push, pop = heapq.heappush, heapq.heappop
+        dist = {source: 0.0}
+        parent = {source: -1}
+        done = set()
+        fringe = [(0.0, source)]
+        while fringe:
+            dist_v, v = pop(fringe)
+            if v in done:
+                continue
+            done.add(v)
+            if remaining is not None:
+                remaining.discard(v)
+                if not remaining:
+                    break
+            y, x = divmod(v, width)
+            step_cost = enter_cost[v]
+            for u, inside in ((v - width, y > y0), (v + width, y + 1 < y1),
+                              (v - 1, x > x0), (v + 1, x + 1 < x1)):
+                if not inside or not nodes[u] or u in done:
+                    continue
+                vu_dist = dist_v + (step_cost if reverse else enter_cost[u])
+                if u not in dist or vu_dist < dist[u]:
+                    dist[u] = vu_dist
+                    parent[u] = v
+                    push(fringe, (vu_dist, u))
+        return {v: dist[v] for v in done}, parent
+
+    def get_intra_edges(self, cluster):
+        """Aristas entre los tiles de transición del cluster con el clima actual; se calculan una vez."""
+        key = (self.pathfinder.weather_modifier, cluster)
+        edges = self.intra_edges.get(key)
+        if edges is None:
+            edges = {}
+            cluster_entrances = self.entrances.get(cluster, [])
+            for tile in cluster_entrances:
+                dist, _ = self.cluster_search(tile, cluster, cluster_entrances)
+                edges[tile] = [(other, dist[other]) for other in cluster_entrances
+                               if other != tile and other in dist]
+            self.intra_edges[key] = edges
+        return edges
+
+    def search(self, start, goal):
+        """
+        Camino abstracto de start a goal (tuplas (x, y)). Devuelve (costo, [start, transiciones..., goal])
+        o None si no hay camino o algún extremo no es nodo.
+        """
+        pathfinder = self.pathfinder
+        if not pathfinder.has_node(start) or not pathfinder.has_node(goal):
+            return None
+        width = self.width
+        source = start[1] * width + start[0]
+        target = goal[1] * width + goal[0]
+        start_cluster = self.cluster_of(source)
+        goal_cluster = self.cluster_of(target)
+
+        # Conectar inicio y destino a las transiciones de su cluster
+        start_dist, _ = self.cluster_search(source, start_cluster)
+        start_edges = [(tile, start_dist[tile]) for tile in self.entrances.get(start_cluster, [])
+                       if tile in start_dist]
+        goal_dist, _ = self.cluster_search(target, goal_cluster, reverse=True)
+        goal_edges = {tile: goal_dist[tile] for tile in self.entrances.get(goal_cluster, [])
+                      if tile in goal_dist}
+
+        best_cost, best_path = float("inf"), None
+        if start_cluster == goal_cluster and target in start_dist:
+            # Camino directo dentro del cluster
+            best_cost, best_path = start_dist[target], [start, goal]
+
+        # A* sobre el grafo abstracto con heurística Manhattan
+        h_scale = pathfinder.min_step_cost
+        goal_x, goal_y = goal
+        enter_cost = pathfinder.enter_cost
+        push, pop = heapq.heappush, heapq.heappop
+        counter = count()
+        seen = {}
+        parent = {}
+        done = set()
+        fringe = []
+        for tile, cost in start_edges:
+            if tile not in seen or cost < seen[tile]:
+                seen[tile] = cost
+                parent[tile] = None
+                ty, tx = divmod(tile, width)
+                push(fringe, (cost + (abs(tx - goal_x) + abs(ty - goal_y)) * h_scale, next(counter), tile))
+        while fringe:
+            priority, _, v = pop(fringe)
+            if priority >= best_cost:
+                break
+            if v in done:
+                continue
+            done.add(v)
+            if v == _GOAL:
+                best_cost = seen[_GOAL]
+                best_path = self.abstract_path(parent, start, goal)
+                break
+            dist_v = seen[v]
+            neighbors = list(self.get_intra_edges(self.cluster_of(v)).get(v, ()))
+            neighbors.extend((u, enter_cost[u]) for u in self.inter_edges.get(v, ()))
+            if v in goal_edges:
+                neighbors.append((_GOAL, goal_edges[v]))
+            for u, cost in neighbors:
+                if u in done:
+                    continue
+                vu_dist = dist_v + cost
+                if u not in seen or vu_dist < seen[u]:
+                    seen[u] = vu_dist
+                    parent[u] = v
+                    if u == _GOAL:
+                        h = 0.0
+                    else:
+                        uy, ux = divmod(u, width)
+                        h = (abs(ux - goal_x) + abs(uy - goal_y)) * h_scale
+                    push(fringe, (vu_dist + h, next(counter), u))
+
+        if best_path is None:
+            return None
+        return best_cost, best_path
+
+    def abstract_path(self, parent, start, goal):
+        width = self.width
+        path = [goal]
+        node = parent[_GOAL]
+        while node is not None:
+            path.append((node % width, node // width))
+            node = parent[node]
+        if path[-1] != start:
+            path.append(start)
+        path.reverse()
+        return path
+
+    def refine_segment(self, a, b):
+        """Camino real [(x, y), ...] de a a b, dos nodos consecutivos de un camino abstracto."""
+        width = self.width
+        source = a[1] * width + a[0]
+        target = b[1] * width + b[0]
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and self.cluster_of(source) != self.cluster_of(target):
+            # Cruce de borde entre dos clusters
+            return [a, b]
+        _, parent = self.cluster_search(source, self.cluster_of(source), (target,))
+        if target not in parent:
+            return None
+        return self.pathfinder.path_from_tree(parent, b)
+
+    def find_path(self, start, goal):
+        """Camino real completo de start a goal (refina todos los tramos), o None si no existe."""
+        result = self.search(start, goal)
+        if result is None:
+            return None
+        abstract = result[1]
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            segment = self.refine_segment(a, b)
+            if segment is None:
+                return None
+            path.extend(segment[1:])
+        return path
@@ -1,10 +1,56 @@
 import heapq
 
+from spatial_hash import JobSpatialHash
+
 class Inventory:
     def __init__(self, max_weight):
         self.max_weight = max_weight
-        self.jobs = []  # lista de Job aceptados (todos)
-        self.picked_jobs = []  # lista de Job recogidos (solo los que están físicamente con el personaje)
+        self.version = 0  # aumenta con cada cambio de trabajos aceptados o recogidos (cachés del AI y vistas ordenadas)
+        # Trabajos por id, en orden de aceptación / recogida
+        self.jobs_by_id = {}  # Job aceptados (todos)
+        self.picked_by_id = {}  # Job recogidos (solo los que están físicamente con el personaje)
+        # Pesos totales, actualizados con cada cambio
+        self.jobs_weight = 0
+        self.picked_weight = 0
+        # Listas de jobs y picked_jobs; se rearman solo cuando cambian los trabajos
+        self.jobs_list = []
+        self.picked_list = []
+        self.sorted_views = {}  # {orden: (versión, lista ordenada)}
+        # Trabajos aceptados por tile desde el que se recogen / entregan
+        self.pickup_hash = JobSpatialHash()
+        self.dropoff_hash = JobSpatialHash()
+
+    @property
+    def jobs(self):
+        """Lista de Job aceptados; no se copia en cada lectura."""
+        if self.jobs_list is None:
+            self.jobs_list = list(self.jobs_by_id.values())
+        return self.jobs_list
+
+    @jobs.setter
+    def jobs(self, jobs):
+        self.jobs_by_id = {job.id: job for job in jobs}
+        self.jobs_weight = sum(job.weight for job in self.jobs_by_id.values())
+        self.pickup_hash.clear()
+        self.dropoff_hash.clear()
+        for job in self.jobs_by_id.values():
+            self.add_to_hashes(job)
+        self.jobs_list = None
+        self.version += 1
+
+    @property
+    def picked_jobs(self):
+        """Lista de Job recogidos; no se copia en cada lectura."""
+        if self.picked_list is None:
+            self.picked_list = list(self.picked_by_id.values())
+        return self.picked_list
+
+    @picked_jobs.setter
+    def picked_jobs(self, jobs):
+        self.picked_by_id = {job.id: job for job in jobs}
+        self.picked_weight = sum(job.weight for job in self.picked_by_id.values())
+        self.picked_list = None
+        self.version += 1
 
     def is_neighbor(self, pos1, pos2):
         """Check if pos1 is the same or adjacent (including diagonals) to pos2."""
@@ -15,10 +61,16 @@ class Inventory:
     def pickup_job(self, job, character_pos, mapa=None):
         # Permitir recoger si el jugador está en el pickup o en un tile vecino
         if self.is_neighbor(character_pos, job.pickup):
+            if not job.picked_up:
+                self.version += 1
             job.picked_up = True
             # Mover el trabajo a la lista de recogidos si no está ya ahí
-            if job not in self.picked_jobs:
-                self.picked_jobs.append(job)
+            if self.picked_by_id.get(job.id) is not job:
+                self.remove_picked(job.id)
+                self.picked_by_id[job.id] = job
+                self.picked_weight += job.weight
+                self.picked_list = None
+                self.version += 1
             return True
         return False
 
@@ -31,12 +83,20 @@ class Inventory:
 
     def total_weight(self):
         """Devuelve el peso total de los trabajos recogidos en el inventario."""
-        return sum(job.weight for job in self.picked_jobs)
+        return self.picked_weight
 
     def accept_job(self, job):
         """Acepta un job si no excede el peso máximo."""
         if self.get_total_jobs_weight() + job.weight <= self.max_weight:
-            self.jobs.append(job)
+            previous = self.jobs_by_id.pop(job.id, None)
+            if previous is not None:
+                self.jobs_weight -= previous.weight
+                self.remove_from_hashes(previous)
+            self.jobs_by_id[job.id] = job
+            self.jobs_weight += job.weight
+            self.add_to_hashes(job)
+            self.jobs_list = None
+            self.version += 1
             return True
         return False
 
@@ -46,8 +106,44 @@ class Inventory:
 
     def remove_job(self, job_id):
         """Elimina un job por id de ambas listas."""
-        self.jobs = [job for job in self.jobs if job.id != job_id]
-        self.picked_jobs = [job for job in self.picked_jobs if job.id != job_id]
+        job = self.jobs_by_id.pop(job_id, None)
+        if job is not None:
+            # Con la lista vacía se vuelve a 0 exacto (sin arrastrar errores de redondeo)
+            self.jobs_weight = self.jobs_weight - job.weight if self.jobs_by_id else 0
+            self.jobs_list = None
+            self.remove_from_hashes(job)
+        self.remove_picked(job_id)
+        self.version += 1
+
+    def remove_picked(self, job_id):
+        """Saca un job por id de los recogidos."""
+        job = self.picked_by_id.pop(job_id, None)
+        if job is not None:
+            self.picked_weight = self.picked_weight - job.weight if self.picked_by_id else 0
+            self.picked_list = None
+
+    def add_to_hashes(self, job):
+        self.pickup_hash.add(job, job.pickup)
+        self.dropoff_hash.add(job, job.dropoff)
+
+    def remove_from_hashes(self, job):
+        self.pickup_hash.remove(job, job.pickup)
+        self.dropoff_hash.remove(job, job.dropoff)
+
+    def get_pickups_near(self, position):
+        """Trabajos aceptados sin recoger que se pueden recoger desde position, en orden de aceptación."""
+        return [job for job in self.pickup_hash.get(position) if not job.picked_up]
+
+    def get_dropoffs_near(self, position):
+        """Trabajos recogidos que se pueden entregar desde position, en orden de aceptación."""
+        return [job for job in self.dropoff_hash.get(position) if job.picked_up]
+
+    def get_sorted_view(self, order):
+        """Vista ordenada guardada, si sigue vigente para la versión actual del inventario."""
+        cached = self.sorted_views.get(order)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        return None
 
     def traverse(self, reverse=False):
         """Recorre el inventario hacia adelante o atrás."""
@@ -56,7 +152,11 @@ class Inventory:
     def filter_by_priority(self):
         """Devuelve los jobs ordenados por prioridad (mayor primero) usando un heap.
         Se agrega un desempate por id (o índice) para evitar comparar objetos Job directamente.
+        La lista se guarda hasta que cambie el inventario.
         """
+        sorted_jobs = self.get_sorted_view('priority')
+        if sorted_jobs is not None:
+            return sorted_jobs
         heap = []
         for idx, job in enumerate(self.jobs):
             tiebreaker = getattr(job, 'id', idx)
@@ -66,19 +166,28 @@ class Inventory:
         while heap:
             _, _, job = heapq.heappop(heap)
             sorted_jobs.append(job)
+        self.sorted_views['priority'] = (self.version, sorted_jobs)
         return sorted_jobs
 
     def filter_by_deadline(self):
-        """Devuelve los jobs ordenados por deadline (más pronto primero) usando insertion sort."""
+        """
+        Devuelve los jobs ordenados por deadline (más pronto primero) usando insertion sort.
+        La lista se guarda hasta que cambie el inventario.
+        """
+        jobs_sorted = self.get_sorted_view('deadline')
+        if jobs_sorted is not None:
+            return jobs_sorted
         jobs_sorted = self.jobs[:]
         for i in range(1, len(jobs_sorted)):
             key_job = jobs_sorted[i]
+            key = key_job.get_deadline_sort_key()
             j = i - 1
-            while j >= 0 and jobs_sorted[j].deadline > key_job.deadline:
+            while j >= 0 and jobs_sorted[j].get_deadline_sort_key() > key:
                 jobs_sorted[j + 1] = jobs_sorted[j]
                 j -= 1
             jobs_sorted[j + 1] = key_job
 
+        self.sorted_views['deadline'] = (self.version, jobs_sorted)
         return jobs_sorted
 
     def get_max_weight(self):
@@ -91,7 +200,7 @@ class Inventory:
 
     def get_total_jobs_weight(self):
         """Devuelve el peso total de todos los trabajos (recogidos y no recogidos)."""
-        return sum(job.weight for job in self.jobs)
+        return self.jobs_weight
 
     def get_jobs(self):
         """Devuelve la lista de trabajos en el inventario."""
@@ -103,16 +212,11 @@ class Inventory:
 
     def cancel_job(self, job_id):
         """Cancela un job aceptado y lo elimina del inventario."""
-        # Encontrar el job a cancelar
-        for job in self.jobs:
-            if job.id == job_id:
-                self.remove_job(job_id)
-                return True
+        if job_id in self.jobs_by_id:
+            self.remove_job(job_id)
+            return True
         return False
 
     def get_job_by_id(self, job_id):
         """Devuelve un trabajo por su ID si existe en el inventario."""
-        for job in self.jobs:
-            if job.id == job_id:
-                return job
-        return None
+        return self.jobs_by_id.get(job_id)
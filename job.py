@@ -1,10 +1,35 @@
+def parse_deadline(deadline):
+    """
+    Convierte el deadline a segundos de juego. Acepta 'MM:SS', 'HH:MM:SS' o una fecha ISO como
+    '2025-09-01T12:08Z' (se toma la hora y se ignora la 'Z'). Devuelve None si no se puede leer.
+    """
+    if isinstance(deadline, (int, float)):
+        return int(deadline)
+    try:
+        time_part = deadline.split('T')[1] if 'T' in deadline else deadline
+        parts = [int(part) for part in time_part.rstrip('Z').split(":")]
+    except (AttributeError, ValueError):
+        return None
+    if len(parts) == 2:
+        return parts[0] * 60 + parts[1]
+    if len(parts) == 3:
+        return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    return None
+
+
 class Job:
+    # Sin __dict__ por trabajo: los feeds generados tienen decenas de miles de trabajos
+    __slots__ = ("id", "pickup", "dropoff", "payout", "deadline", "deadline_seconds", "weight",
+                 "priority", "release_time", "picked_up")
+
     def __init__(self, id, pickup, dropoff, payout, deadline, weight, priority, release_time):
         self.id = id
         self.pickup = tuple(pickup)
         self.dropoff = tuple(dropoff)
         self.payout = payout
         self.deadline = deadline
+        # Deadline en segundos de juego, calculado una sola vez (None si el texto no se puede leer)
+        self.deadline_seconds = parse_deadline(deadline)
         self.weight = weight
         self.priority = priority
         self.release_time = release_time
@@ -71,26 +96,10 @@ class Job:
     def is_expired(self, elapsed_seconds):
         """
         Devuelve True si el trabajo ha expirado (el tiempo actual ha superado el deadline).
-        El deadline se espera en formato 'HH:MM:SS', 'HH:MM' o puede terminar en 'Z'.
+        Un deadline que no se pudo leer nunca expira.
         """
-        try:
-            if 'T' in self.deadline:
-                time_part = self.deadline.split('T')[1]
-            else:
-                time_part = self.deadline
-            time_part = time_part.rstrip('Z')
-            parts = time_part.split(":")
-            if len(parts) == 2:
-                min_deadline = int(parts[0])
-                sec_deadline = int(parts[1])
-                deadline_seconds = min_deadline * 60 + sec_deadline
-            elif len(parts) == 3:
-                hour_deadline = int(parts[0])
-                min_deadline = int(parts[1])
-                sec_deadline = int(parts[2])
-                deadline_seconds = hour_deadline * 3600 + min_deadline * 60 + sec_deadline
-            else:
-                return False
-            return elapsed_seconds > deadline_seconds
-        except Exception:
-            return False
+        return self.deadline_seconds is not None and elapsed_seconds > self.deadline_seconds
+
+    def get_deadline_sort_key(self):
+        """Clave para ordenar por deadline: los que no se pudieron leer van al final."""
+        return self.deadline_seconds if self.deadline_seconds is not None else float("inf")
@@ -1,38 +1,85 @@
 import heapq
 
+# La cola se reconstruye sin entradas eliminadas cuando estas superan a las vigentes (y a este mínimo)
+MIN_STALE_ENTRIES = 64
+
+
 class JobManager:
     def __init__(self, jobs):
         self.job_priority_queue = []
+        # Trabajos por id: pendientes de liberar y visibles (en orden de liberación)
+        self.pending = {}
+        self.visible = {}
+        self.stale_entries = 0  # entradas de la cola de trabajos ya eliminados (se saltan al liberar)
+        self.visible_list = []  # lista de visible_jobs; se rearma solo cuando cambian los visibles
+        self.visible_dirty = False
+        self.version = 0  # aumenta con cada cambio de los trabajos visibles
         for job in jobs:
             self.add_job_to_queue(job)
-        self.visible_jobs = []
+
+    @property
+    def visible_jobs(self):
+        # Lista de trabajos visibles; no se copia en cada lectura
+        if self.visible_dirty:
+            self.visible_list = list(self.visible.values())
+            self.visible_dirty = False
+        return self.visible_list
+
+    @visible_jobs.setter
+    def visible_jobs(self, jobs):
+        self.visible = {job.id: job for job in jobs}
+        self.visible_dirty = True
+        self.version += 1
 
     def add_job_to_queue(self, job):
-        # Insertar en la cola de prioridad
+        # Insertar en la cola de prioridad (si reemplaza a otro trabajo con el mismo id, su entrada queda eliminada)
+        if job.id in self.pending:
+            self.stale_entries += 1
+        self.pending[job.id] = job
         heapq.heappush(self.job_priority_queue, (job.get_release_time(), job.id, job))
 
+    def get_job(self, job_id):
+        """Trabajo pendiente o visible con ese id, o None."""
+        job = self.visible.get(job_id)
+        return job if job is not None else self.pending.get(job_id)
+
     def get_pending_jobs(self):
-        # Retorna solo los objetos Job de la cola de prioridad
-        return [job for _, _, job in self.job_priority_queue]
+        # Retorna solo los objetos Job de la cola de prioridad que siguen pendientes
+        return [job for _, job_id, job in self.job_priority_queue if self.pending.get(job_id) is job]
 
     def update_visible_jobs(self, current_time):
         # Liberar trabajos de la cola de prioridad cuando el tiempo actual alcanza o supera el release_time
         while self.job_priority_queue and self.job_priority_queue[0][0] <= current_time:
             release_time, job_id, job = heapq.heappop(self.job_priority_queue)
-            self.visible_jobs.append(job)
+            if self.pending.get(job_id) is not job:
+                # Entrada de un trabajo ya eliminado
+                self.stale_entries -= 1
+                continue
+            del self.pending[job_id]
+            self.visible[job_id] = job
+            self.visible_dirty = True
+            self.version += 1
 
     def show_jobs(self):
         # Devuelve los trabajos visibles para mostrar en pantalla
         return self.visible_jobs
 
     def remove_job(self, job_id):
-        # Eliminar de la cola de prioridad
-        new_queue = []
-        for release_time, jid, job in self.job_priority_queue:
-            if jid != job_id:
-                new_queue.append((release_time, jid, job))
-        self.job_priority_queue = new_queue
-        heapq.heapify(self.job_priority_queue)
+        # Un trabajo pendiente solo se saca del diccionario: su entrada en la cola queda
+        # marcada como eliminada y se descarta al llegar al frente
+        if self.pending.pop(job_id, None) is not None:
+            self.stale_entries += 1
+            if self.stale_entries > max(MIN_STALE_ENTRIES, len(self.pending)):
+                self.compact_queue()
 
         # Eliminar de visible_jobs
-        self.visible_jobs = [job for job in self.visible_jobs if job.id != job_id]
+        if self.visible.pop(job_id, None) is not None:
+            self.visible_dirty = True
+            self.version += 1
+
+    def compact_queue(self):
+        """Reconstruye la cola solo con los trabajos pendientes (O(n), amortizado entre las eliminaciones)."""
+        self.job_priority_queue = [entry for entry in self.job_priority_queue
+                                   if self.pending.get(entry[1]) is entry[2]]
+        heapq.heapify(self.job_priority_queue)
+        self.stale_entries = 0
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import pickle
+from array import array
+
+from pathfinding import GridPathfinder
+
+# Versión del formato del archivo; cambiarla invalida los archivos ya guardados
+LANDMARKS_FORMAT = 1
+# Cantidad de landmarks por mapa
+DEFAULT_LANDMARK_COUNT = 8
+
+INF = float("inf")
+
+
+def map_key(mapa):
+    """Hash de los tiles y la leyenda del mapa: identifica el archivo de landmarks que le corresponde."""
+    content = json.dumps({"tiles": mapa.tiles, "legend": mapa.legend}, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def landmarks_path(map_file):
+    """Archivo de landmarks junto al JSON del mapa: city_map.json -> city_map.landmarks"""
+    return os.path.splitext(map_file)[0] + ".landmarks"
+
+
+class LandmarkOracle:
+    """
+    Oráculo de distancias ALT (A*, Landmarks y desigualdad triangular) sobre el grafo del
+    GridPathfinder. Para unos pocos tiles "landmark" guarda el costo exacto desde y hacia cada
+    tile del mapa; con eso, para cualquier par (a, b):
+
+        d(a, b) >= d(L, b) - d(L, a)    y    d(a, b) >= d(a, L) - d(b, L)
+
+    La mejor de esas cotas es una estimación instantánea que nunca sobreestima el costo real.
+    Las distancias se calculan con el modificador de clima en 0: el clima solo encarece los
+    tiles, así que la cota sigue siendo válida con cualquier clima.
+    """
+    def __init__(self, width, height, node_grid, landmarks, from_landmark, to_landmark, key=None):
+        self.width = width
+        self.height = height
+        self.node_grid = node_grid  # 1 si el tile es nodo del grafo (como en GridPathfinder)
+        self.landmarks = landmarks  # índices planos y * width + x de los landmarks
+        self.from_landmark = from_landmark  # por landmark: array con d(L, tile)
+        self.to_landmark = to_landmark  # por landmark: array con d(tile, L)
+        self.key = key
+        self.tables = list(zip(from_landmark, to_landmark))
+
+    @classmethod
+    def build(cls, mapa, count=DEFAULT_LANDMARK_COUNT):
+        """
+        Elige los landmarks por el punto más lejano: cada uno es el tile accesible cuya distancia
+        al landmark más cercano ya elegido es la mayor. Quedan repartidos por los bordes del mapa,
+        que es donde dan las mejores cotas.
+        """
+        pathfinder = GridPathfinder(mapa, 0.0)
+        candidates = [index for index, is_blocked in enumerate(pathfinder.blocked_grid) if not is_blocked]
+        landmarks, from_landmark, to_landmark = [], [], []
+        key = map_key(mapa)
+        if not candidates:
+            return cls(mapa.width, mapa.height, pathfinder.node_grid, landmarks, from_landmark, to_landmark, key)
+
+        # El primero es el tile más lejano a un tile cualquiera
+        nearest = pathfinder.distance_field(candidates[0])
+        while len(landmarks) < min(count, len(candidates)):
+            landmark = max(candidates, key=lambda index: nearest[index] if nearest[index] < INF else -1.0)
+            if landmarks and nearest[landmark] <= 0.0:
+                break
+            forward = pathfinder.distance_field(landmark)
+            landmarks.append(landmark)
+            from_landmark.append(forward)
+            to_landmark.append(pathfinder.distance_field(landmark, reverse=True))
+            if len(landmarks) == 1:
+                nearest = array("d", forward)
+            else:
+                for index in candidates:
+                    if forward[index] < nearest[index]:
+                        nearest[index] = forward[index]
+        return cls(mapa.width, mapa.height, pathfinder.node_grid, landmarks, from_landmark, to_landmark, key)
+
+    @classmethod
+    def load_or_build(cls, mapa, map_file, count=DEFAULT_LANDMARK_COUNT):
+        """
+        Carga los landmarks guardados junto al mapa si corresponden a sus tiles y leyenda;
+        si no existen o el mapa cambió, los calcula y los guarda para el próximo inicio.
+        """
+        path = landmarks_path(map_file)
+        key = map_key(mapa)
+        oracle = cls.load(path)
+        if oracle is not None and oracle.key == key:
+            return oracle
+        oracle = cls.build(mapa, count)
+        oracle.save(path)
+        return oracle
+
+    @classmethod
+    def load(cls, path):
+        """Lee un archivo de landmarks; devuelve None si no existe o no se puede leer."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                data = pickle.load(file)
+            if data.get("format") != LANDMARKS_FORMAT:
+                return None
+            return cls(data["width"], data["height"], data["node_grid"], data["landmarks"],
+                       data["from_landmark"], data["to_landmark"], data["key"])
+        except Exception as e:
+            print(f"Error al cargar landmarks: {e}")
+            return None
+
+    def save(self, path):
+        """Guarda los landmarks; si no se puede escribir el archivo, el juego sigue con los de memoria."""
+        data = {
+            "format": LANDMARKS_FORMAT,
+            "key": self.key,
+            "width": self.width,
+            "height": self.height,
+            "node_grid": self.node_grid,
+            "landmarks": self.landmarks,
+            "from_landmark": self.from_landmark,
+            "to_landmark": self.to_landmark
+        }
+        try:
+            with open(path, "wb") as file:
+                pickle.dump(data, file)
+            return True
+        except Exception as e:
+            print(f"Error al guardar landmarks: {e}")
+            return False
+
+    def index_bound(self, a, b):
+        """Cota inferior del costo del índice a al índice b (inf si se sabe que no hay camino)."""
+        bound = 0.0
+        for forward, backward in self.tables:
+            from_a = forward[a]
+            if from_a < INF:
+                # d(L, b) - d(L, a); si b no es alcanzable desde L pero a sí, tampoco desde a
+                estimate = forward[b] - from_a
+                if estimate > bound:
+                    bound = estimate
+            to_b = backward[b]
+            if to_b < INF:
+                # d(a, L) - d(b, L)
+                estimate = backward[a] - to_b
+                if estimate > bound:
+                    bound = estimate
+        return bound
+
+    def lower_bound(self, start, goal):
+        """Cota inferior del costo de start a goal (tuplas (x, y)); None si alguno no es nodo del grafo."""
+        width, height = self.width, self.height
+        if not (0 <= start[0] < width and 0 <= start[1] < height and
+                0 <= goal[0] < width and 0 <= goal[1] < height):
+            return None
+        a = start[1] * width + start[0]
+        b = goal[1] * width + goal[0]
+        if not self.node_grid[a] or not self.node_grid[b]:
+            return None
+        return self.index_bound(a, b)
@@ -1,16 +1,17 @@
 import pygame
 import constants
 from SaveData import SaveData
+from assets import asset_manager
+from fonts import fonts, text_cache
 
 class MainMenu:
     def __init__(self, screen):
         self.screen = screen
         self.save_system = SaveData()
-        if not pygame.font.get_init():
-            pygame.font.init()
-        self.font_title = pygame.font.SysFont(None, 48)
-        self.font_menu = pygame.font.SysFont(None, 32)
-        self.font_info = pygame.font.SysFont(None, 24)
+        fonts.load()
+        self.font_title = fonts.get(48)
+        self.font_menu = fonts.get(32)
+        self.font_info = fonts.get(24)
         
         # Verificar si existe un guardado
         has_save = self.save_system.get_save_info(1) is not None
@@ -18,7 +19,7 @@ class MainMenu:
         
         # Cargar imagen de fondo del HUD para el menú
         try:
-            self.hud_img = pygame.image.load("sprites/hud.png").convert_alpha()
+            self.hud_img = asset_manager.get_image("sprites/hud.png")
             # Usar el tamaño original de la imagen
             self.menu_width = self.hud_img.get_width()
             self.menu_height = self.hud_img.get_height()
@@ -37,7 +38,7 @@ class MainMenu:
         menu_y = (constants.HEIGHT_SCREEN - self.menu_height) // 2
 
         # Título del juego
-        title_text = self.font_title.render("COURIER QUEST", True, (255, 255, 0))
+        title_text = text_cache.render(self.font_title, "COURIER QUEST", (255, 255, 0))
         title_rect = title_text.get_rect(center=(constants.WIDTH_SCREEN // 2, menu_y + 60))
         self.screen.blit(title_text, title_rect)
         
@@ -45,13 +46,13 @@ class MainMenu:
         base_y = menu_y + 120
         
         # Nueva Partida
-        new_game_text = self.font_menu.render("[N] Nueva Partida", True, (255, 255, 255))
+        new_game_text = text_cache.render(self.font_menu, "[N] Nueva Partida", (255, 255, 255))
         new_game_rect = new_game_text.get_rect(center=(constants.WIDTH_SCREEN // 2, base_y))
         self.screen.blit(new_game_text, new_game_rect)
         
         # Continuar Partida (solo si existe guardado)
         if self.has_save:
-            continue_text = self.font_menu.render("[C] Continuar Partida", True, (255, 255, 255))
+            continue_text = text_cache.render(self.font_menu, "[C] Continuar Partida", (255, 255, 255))
             continue_rect = continue_text.get_rect(center=(constants.WIDTH_SCREEN // 2, base_y + 50))
             self.screen.blit(continue_text, continue_rect)
             salir_y = base_y + 100
@@ -59,7 +60,7 @@ class MainMenu:
             salir_y = base_y + 50
         
         # Salir
-        exit_text = self.font_menu.render("[S] Salir", True, (255, 255, 255))
+        exit_text = text_cache.render(self.font_menu, "[S] Salir", (255, 255, 255))
         exit_rect = exit_text.get_rect(center=(constants.WIDTH_SCREEN // 2, salir_y))
         self.screen.blit(exit_text, exit_rect)
         
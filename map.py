@@ -2,11 +2,85 @@ import pygame
 import json
 import sys
 import os
+from array import array
+from collections import OrderedDict
+from camera import Camera
+from assets import asset_manager
+
+# Tipos de sprite de edificio; el índice de cada tipo es el valor guardado en building_sprite_index
+BUILDING_SPRITE_TYPES = (
+    "center", "top_left", "top_right", "bottom_left", "bottom_right",
+    "left_border", "right_border", "bottom_border", "top_edge"
+)
+
+# Los tiles se pre-renderizan en bloques de ~CHUNK_PIXELS px de lado por nivel de zoom
+CHUNK_PIXELS = 320
+# Máximo de bloques pre-renderizados en memoria (se descartan los usados hace más tiempo)
+MAX_CACHED_CHUNKS = 64
+
+# Vecinos ortogonales en el orden usado por la IA: arriba, abajo, izquierda, derecha
+NEIGHBOR_OFFSETS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# Color de los tiles cerrados temporalmente (obras, accidentes)
+CLOSED_COLOR = (230, 120, 20)
+
+# Bits de la máscara de autotile: el propio tile y sus vecinos ortogonales que son edificio
+_SELF, _TOP, _BOTTOM, _LEFT, _RIGHT = 1, 2, 4, 8, 16
+
+
+def _autotile_sprite_type(mask):
+    """Determina qué tipo de sprite de edificio usar basado en los vecinos de la máscara"""
+    if not mask & _SELF:
+        return "center"
+    has_top = bool(mask & _TOP)
+    has_bottom = bool(mask & _BOTTOM)
+    has_left = bool(mask & _LEFT)
+    has_right = bool(mask & _RIGHT)
+
+    # Esquinas
+    if not has_top and not has_left:
+        return "top_left"
+    elif not has_top and not has_right:
+        return "top_right"
+    elif not has_bottom and not has_left:
+        return "bottom_left"
+    elif not has_bottom and not has_right:
+        return "bottom_right"
+
+    # Bordes
+    elif not has_left and (has_top or has_bottom):
+        return "left_border"
+    elif not has_right and (has_top or has_bottom):
+        return "right_border"
+    elif not has_bottom and (has_left or has_right):
+        return "bottom_border"
+    elif not has_top and (has_left or has_right):
+        return "top_edge"
+
+    # Centro por defecto
+    else:
+        return "center"
+
+
+# Tablas de traducción byte a byte: "B" -> 1 y máscara (0-31) -> índice de sprite
+_BUILDING_FLAG_TABLE = bytes(1 if i == ord("B") else 0 for i in range(256))
+_AUTOTILE_TABLE = bytes(
+    BUILDING_SPRITE_TYPES.index(_autotile_sprite_type(i)) if i < 32 else 0 for i in range(256)
+)
+
 
 class Map:
-    def __init__(self, archivo_json, tile_size, hud_height = 60, top_bar_height = 40):
+    def __init__(self, archivo_json, tile_size, hud_height = 60, top_bar_height = 40, load_sprites=True):
         self.tile_size = tile_size
+        self.load_sprites = load_sprites  # False en la simulación sin pantalla: solo datos, sin imágenes
         self.tiles = []
+        self.building_sprite_index = bytearray()  # índice de sprite por tile (fila por fila)
+        self.blocked_grid = bytearray()  # 1 si el tile está bloqueado (fila por fila)
+        self.surface_grid = array("d")  # peso de superficie de cada tile (fila por fila)
+        # Cierres temporales de calles: 1 si el tile está cerrado (también queda en blocked_grid)
+        self.closed_grid = bytearray()
+        self.closure_version = 0  # aumenta con cada cierre o reapertura
+        self.closure_log = []  # (versión, índice) de cada cambio, para leer solo los nuevos
         self.legend = {}
         self.width = 0
         self.height = 0
@@ -19,19 +93,31 @@ class Map:
             "P": (50, 200, 50)     # Parques
         }
 
-        # Cargar sprites de edificios
-        self.building_sprites = self.load_building_sprites()
-        # Cargar sprites de parques (grass)
-        self.grass_sprites = self.load_grass_sprites()
-        # Cargar sprites de calles (street)
-        self.street_sprites = self.load_street_sprites()
+        if load_sprites:
+            # Cargar sprites de edificios
+            self.building_sprites = self.load_building_sprites()
+            # Cargar sprites de parques (grass)
+            self.grass_sprites = self.load_grass_sprites()
+            # Cargar sprites de calles (street)
+            self.street_sprites = self.load_street_sprites()
+        else:
+            self.building_sprites, self.grass_sprites, self.street_sprites = {}, {}, {}
+
+        # Sprites ya escalados por tamaño de tile (uno por nivel de zoom)
+        self.sprite_sets = {tile_size: (self.building_sprites, self.grass_sprites, self.street_sprites)}
+
+        # Capa estática del mapa: bloques de tiles pre-renderizados por (tamaño de tile, bloque x, bloque y)
+        self.chunk_cache = OrderedDict()
+        self._chunk_tiles_id = None
+        self.default_camera = None
 
         # Cargar datos
         self.load_from_json(archivo_json)
 
-    def load_building_sprites(self):
+    def load_building_sprites(self, tile_size=None):
         """Carga todos los sprites de edificios desde la carpeta sprites/buildings/"""
         sprites = {}
+        tile_size = tile_size or self.tile_size
         building_path = "sprites/buildings"
 
         if not os.path.exists(building_path):
@@ -54,8 +140,7 @@ class Map:
             sprite_path = os.path.join(building_path, filename)
             if os.path.exists(sprite_path):
                 try:
-                    sprite = pygame.image.load(sprite_path).convert_alpha()
-                    sprites[sprite_type] = pygame.transform.scale(sprite, (self.tile_size, self.tile_size))
+                    sprites[sprite_type] = asset_manager.get_image(sprite_path, (tile_size, tile_size))
                 except Exception as e:
                     print(f"Error loading sprite {filename}: {e}")
             else:
@@ -63,9 +148,10 @@ class Map:
 
         return sprites
 
-    def load_grass_sprites(self):
+    def load_grass_sprites(self, tile_size=None):
         """Carga el sprite de hierba (grass) directamente sin iterar"""
         sprites = {}
+        tile_size = tile_size or self.tile_size
         grass_path = os.path.join("sprites", "grass", "grass.png")
 
         if not os.path.exists(grass_path):
@@ -73,16 +159,16 @@ class Map:
             return sprites
 
         try:
-            sprite = pygame.image.load(grass_path).convert_alpha()
-            sprites["center"] = pygame.transform.scale(sprite, (self.tile_size, self.tile_size))
+            sprites["center"] = asset_manager.get_image(grass_path, (tile_size, tile_size))
         except Exception as e:
             print(f"Error loading grass sprite grass.png: {e}")
 
         return sprites
 
-    def load_street_sprites(self):
+    def load_street_sprites(self, tile_size=None):
         """Carga el sprite de calles (street) directamente sin iterar"""
         sprites = {}
+        tile_size = tile_size or self.tile_size
         street_path = os.path.join("sprites", "streets", "street.png")
 
         if not os.path.exists(street_path):
@@ -94,8 +180,7 @@ class Map:
                 return sprites
 
         try:
-            sprite = pygame.image.load(street_path).convert_alpha()
-            sprites["center"] = pygame.transform.scale(sprite, (self.tile_size, self.tile_size))
+            sprites["center"] = asset_manager.get_image(street_path, (tile_size, tile_size))
         except Exception as e:
             print(f"Error loading street sprite: {e}")
 
@@ -113,49 +198,184 @@ class Map:
         self.legend = data["legend"]
         self.width = data["width"]
         self.height = data["height"]
+        self.compile_legend()
+        self.build_building_sprite_index()
+        if self.load_sprites:
+            self.build_static_layer()
+
+    def compile_legend(self):
+        """
+        Traduce la leyenda a grids planos: un bytearray de tiles bloqueados y un array
+        de pesos de superficie, para que las consultas no hagan búsquedas en diccionarios.
+        """
+        blocked_by_tile = {}
+        weight_by_tile = {}
+        for tile, info in self.legend.items():
+            blocked_by_tile[tile] = 1 if info.get("blocked", False) else 0
+            weight_by_tile[tile] = float(info.get("surface_weight", 1.0))
+
+        blocked_grid = bytearray()
+        surface_grid = array("d")
+        for row in self.tiles:
+            blocked_grid += bytes(blocked_by_tile.get(tile, 0) for tile in row)
+            surface_grid.extend(weight_by_tile.get(tile, 1.0) for tile in row)
+        self.blocked_grid = blocked_grid
+        self.surface_grid = surface_grid
+        self.closed_grid = bytearray(len(blocked_grid))
+
+    def get_sprite_set(self, tile_size):
+        """Devuelve (edificios, parques, calles) escalados al tamaño de tile; se escalan una sola vez."""
+        if tile_size not in self.sprite_sets:
+            self.sprite_sets[tile_size] = (
+                self.load_building_sprites(tile_size),
+                self.load_grass_sprites(tile_size),
+                self.load_street_sprites(tile_size)
+            )
+        return self.sprite_sets[tile_size]
+
+    def prepare_zoom_levels(self, tile_sizes):
+        """Pre-escala los sprites de todos los niveles de zoom al cargar."""
+        for tile_size in tile_sizes:
+            self.get_sprite_set(tile_size)
+
+    def get_chunk_tiles(self, tile_size):
+        """Cantidad de tiles por lado de cada bloque pre-renderizado."""
+        return max(4, CHUNK_PIXELS // tile_size)
+
+    def get_chunk(self, chunk_x, chunk_y, tile_size):
+        """
+        Devuelve el bloque de tiles pre-renderizado; se renderiza solo la primera vez que
+        se necesita y se descarta el usado hace más tiempo si se supera MAX_CACHED_CHUNKS.
+        """
+        key = (tile_size, chunk_x, chunk_y)
+        chunk = self.chunk_cache.get(key)
+        if chunk is not None:
+            self.chunk_cache.move_to_end(key)
+            return chunk
+        chunk_tiles = self.get_chunk_tiles(tile_size)
+        x0, y0 = chunk_x * chunk_tiles, chunk_y * chunk_tiles
+        x1, y1 = min(self.width, x0 + chunk_tiles), min(self.height, y0 + chunk_tiles)
+        chunk = pygame.Surface(((x1 - x0) * tile_size, (y1 - y0) * tile_size)).convert()
+        chunk.fill((0, 0, 0))
+        self.render_tiles(chunk, x0, y0, x1, y1, tile_size)
+        self.chunk_cache[key] = chunk
+        if len(self.chunk_cache) > MAX_CACHED_CHUNKS:
+            self.chunk_cache.popitem(last=False)
+        return chunk
 
-    # Dibuja el mapa completo recorriendo los tiles dados por el json y se colorea dependiendo de su tipo
-    def draw_map(self, screen):
-        for y, row in enumerate(self.tiles):
-            for x, tile in enumerate(row):
+    def build_static_layer(self):
+        """Pre-renderiza la capa estática al tamaño de tile base (hasta llenar la caché de bloques).
+        Solo se reconstruye cuando cambian los tiles o el tamaño de tile."""
+        self.chunk_cache.clear()
+        self._chunk_tiles_id = id(self.tiles)
+        chunk_tiles = self.get_chunk_tiles(self.tile_size)
+        chunks_x = (self.width + chunk_tiles - 1) // chunk_tiles
+        chunks_y = (self.height + chunk_tiles - 1) // chunk_tiles
+        for chunk_y in range(chunks_y):
+            for chunk_x in range(chunks_x):
+                if len(self.chunk_cache) >= MAX_CACHED_CHUNKS:
+                    return
+                self.get_chunk(chunk_x, chunk_y, self.tile_size)
+
+    def set_tile_size(self, tile_size):
+        """Cambia el tamaño de tile base y reconstruye la capa estática."""
+        if tile_size == self.tile_size:
+            return
+        self.tile_size = tile_size
+        self.building_sprites, self.grass_sprites, self.street_sprites = self.get_sprite_set(tile_size)
+        self.default_camera = None
+        self.build_static_layer()
+
+    def get_default_camera(self):
+        """Vista que muestra el mapa completo al tamaño de tile base debajo de la barra superior."""
+        if self.default_camera is None:
+            self.default_camera = Camera(self.width, self.height, self.tile_size,
+                                         self.width * self.tile_size, self.height * self.tile_size,
+                                         top=self.top_bar_height)
+        return self.default_camera
+
+    # Dibuja los tiles visibles en la cámara: toda la vista, o solo dentro de las áreas dadas (rects de pantalla)
+    def draw_map(self, screen, areas=None, camera=None):
+        if self._chunk_tiles_id != id(self.tiles):
+            self.compile_legend()
+            self.build_building_sprite_index()
+            self.build_static_layer()
+        camera = camera or self.get_default_camera()
+        tile_size = camera.tile_size
+        chunk_tiles = self.get_chunk_tiles(tile_size)
+        chunk_px = chunk_tiles * tile_size
+        map_rect = pygame.Rect(camera.tile_to_screen(0, 0), (self.width * tile_size, self.height * tile_size))
+
+        regions = [camera.view] if areas is None else [camera.view.clip(area) for area in areas]
+        previous_clip = screen.get_clip()
+        for region in regions:
+            if not region.width or not region.height:
+                continue
+            screen.set_clip(region)
+            if not map_rect.contains(region):
+                screen.fill((0, 0, 0), region)
+            # Bloques que se cruzan con la región (en píxeles del mapa)
+            left = region.x - camera.view.x + camera.x
+            top = region.y - camera.view.y + camera.y
+            first_cx, first_cy = max(0, left // chunk_px), max(0, top // chunk_px)
+            last_cx = min((self.width - 1) // chunk_tiles, (left + region.width - 1) // chunk_px)
+            last_cy = min((self.height - 1) // chunk_tiles, (top + region.height - 1) // chunk_px)
+            for chunk_y in range(first_cy, last_cy + 1):
+                for chunk_x in range(first_cx, last_cx + 1):
+                    chunk = self.get_chunk(chunk_x, chunk_y, tile_size)
+                    screen.blit(chunk, camera.world_to_screen(chunk_x * chunk_px, chunk_y * chunk_px))
+        screen.set_clip(previous_clip)
+
+    # Recorre los tiles del rango dado y los dibuja en la superficie dependiendo de su tipo
+    def render_tiles(self, surface, x0, y0, x1, y1, tile_size):
+        building_sprites, grass_sprites, street_sprites = self.get_sprite_set(tile_size)
+        for y in range(y0, y1):
+            row = self.tiles[y]
+            for x in range(x0, x1):
+                tile = row[x]
                 rect = pygame.Rect(
-                    x * self.tile_size,
-                    y * self.tile_size + self.top_bar_height,
-                    self.tile_size,
-                    self.tile_size
+                    (x - x0) * tile_size,
+                    (y - y0) * tile_size,
+                    tile_size,
+                    tile_size
                 )
 
-                if tile == "B" and self.building_sprites:
+                if tile == "B" and building_sprites:
                     # Usar sprites para edificios
                     sprite_type = self.get_building_sprite_type(x, y)
-                    if sprite_type in self.building_sprites:
-                        screen.blit(self.building_sprites[sprite_type], rect.topleft)
+                    if sprite_type in building_sprites:
+                        surface.blit(building_sprites[sprite_type], rect.topleft)
                     else:
                         # Fallback a color sólido si no hay sprite
                         color = self.colors.get(tile, (0, 0, 0))
-                        pygame.draw.rect(screen, color, rect)
+                        pygame.draw.rect(surface, color, rect)
                 elif tile == "P":
                     # Dibujar sprite de grass fijo para parques
-                    grass_sprite = self.grass_sprites.get("center") if self.grass_sprites else None
+                    grass_sprite = grass_sprites.get("center") if grass_sprites else None
                     if grass_sprite:
-                        screen.blit(grass_sprite, rect.topleft)
+                        surface.blit(grass_sprite, rect.topleft)
                     else:
                         # Fallback a color sólido si no hay sprite cargado
                         color = self.colors.get(tile, (0, 0, 0))
-                        pygame.draw.rect(screen, color, rect)
+                        pygame.draw.rect(surface, color, rect)
                 elif tile == "C":
                     # Dibujar sprite de calle si está disponible
-                    street_sprite = self.street_sprites.get("center") if self.street_sprites else None
+                    street_sprite = street_sprites.get("center") if street_sprites else None
                     if street_sprite:
-                        screen.blit(street_sprite, rect.topleft)
+                        surface.blit(street_sprite, rect.topleft)
                     else:
                         # Fallback a color sólido si no hay sprite cargado
                         color = self.colors.get(tile, (0, 0, 0))
-                        pygame.draw.rect(screen, color, rect)
+                        pygame.draw.rect(surface, color, rect)
                 else:
                     # Usar colores sólidos para otros tipos de tiles
                     color = self.colors.get(tile, (0, 0, 0))  # negro si no está definido
-                    pygame.draw.rect(screen, color, rect)
+                    pygame.draw.rect(surface, color, rect)
+
+                if self.closed_grid[y * self.width + x]:
+                    # Tile cerrado: cruz sobre el tile
+                    pygame.draw.line(surface, CLOSED_COLOR, rect.topleft, rect.bottomright, 3)
+                    pygame.draw.line(surface, CLOSED_COLOR, rect.topright, rect.bottomleft, 3)
 
     def get_hud_bottom_y(self):
         # Devuelve la posición Y donde debe ir el HUD inferior
@@ -165,14 +385,80 @@ class Map:
         # fuera del mapa
         if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
             return True
-        tile = self.tiles[tile_y][tile_x]
-        info = self.legend.get(tile, {})
-        return info.get("blocked", False)
-    
+        return self.blocked_grid[tile_y * self.width + tile_x] == 1
+
+    def is_closed(self, tile_x, tile_y):
+        if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
+            return False
+        return self.closed_grid[tile_y * self.width + tile_x] == 1
+
+    def close_tile(self, tile_x, tile_y):
+        """
+        Cierra temporalmente un tile accesible (obras, accidentes): queda bloqueado para moverse
+        y fuera del grafo del AI. Devuelve False si está fuera del mapa, bloqueado o ya cerrado.
+        """
+        if self.is_blocked(tile_x, tile_y):
+            return False
+        index = tile_y * self.width + tile_x
+        self.closed_grid[index] = 1
+        self.blocked_grid[index] = 1
+        self.record_closure_change(tile_x, tile_y)
+        return True
+
+    def reopen_tile(self, tile_x, tile_y):
+        """Reabre un tile cerrado con close_tile. Devuelve False si no estaba cerrado."""
+        if not self.is_closed(tile_x, tile_y):
+            return False
+        index = tile_y * self.width + tile_x
+        self.closed_grid[index] = 0
+        self.blocked_grid[index] = 0
+        self.record_closure_change(tile_x, tile_y)
+        return True
+
+    def record_closure_change(self, tile_x, tile_y):
+        self.closure_version += 1
+        self.closure_log.append((self.closure_version, tile_y * self.width + tile_x))
+        # Los bloques pre-renderizados que contienen el tile se vuelven a dibujar
+        for key in list(self.chunk_cache):
+            tile_size, chunk_x, chunk_y = key
+            chunk_tiles = self.get_chunk_tiles(tile_size)
+            if tile_x // chunk_tiles == chunk_x and tile_y // chunk_tiles == chunk_y:
+                del self.chunk_cache[key]
+
+    def get_closure_changes(self, since_version):
+        """Índices planos de los tiles cerrados o reabiertos después de since_version."""
+        changes = set()
+        for version, index in reversed(self.closure_log):
+            if version <= since_version:
+                break
+            changes.add(index)
+        return changes
+
     def get_surface_weight(self, tile_x, tile_y):
-        tile = self.tiles[tile_y][tile_x]
-        info = self.legend.get(tile, {})
-        return info.get("surface_weight", 1.0)
+        return self.surface_grid[tile_y * self.width + tile_x]
+
+    def get_neighbors(self, tile_x, tile_y):
+        """Devuelve los vecinos ortogonales dentro del mapa como (x, y, bloqueado)."""
+        neighbors = []
+        for dx, dy in NEIGHBOR_OFFSETS:
+            nx, ny = tile_x + dx, tile_y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                neighbors.append((nx, ny, self.blocked_grid[ny * self.width + nx] == 1))
+        return neighbors
+
+    def get_passable_neighbors(self, tile_x, tile_y):
+        """Devuelve los vecinos ortogonales a los que se puede mover desde el tile."""
+        return [(nx, ny) for nx, ny, blocked in self.get_neighbors(tile_x, tile_y) if not blocked]
+
+    def get_blocked_row(self, tile_y):
+        """Devuelve la fila completa de tiles bloqueados (1 = bloqueado) sin copiarla."""
+        start = tile_y * self.width
+        return memoryview(self.blocked_grid)[start:start + self.width]
+
+    def get_surface_row(self, tile_y):
+        """Devuelve la fila completa de pesos de superficie."""
+        start = tile_y * self.width
+        return self.surface_grid[start:start + self.width]
 
     def is_building(self, tile_x, tile_y):
         """Verifica si una posición específica es un edificio"""
@@ -181,50 +467,33 @@ class Map:
         return self.tiles[tile_y][tile_x] == "B"
 
     def get_building_sprite_type(self, tile_x, tile_y):
-        """Determina qué tipo de sprite de edificio usar basado en los tiles vecinos"""
+        """Devuelve el tipo de sprite de edificio precalculado para el tile."""
         if not self.is_building(tile_x, tile_y):
             return "center"  # fallback
+        return BUILDING_SPRITE_TYPES[self.building_sprite_index[tile_y * self.width + tile_x]]
 
-        neighbors = {
-            "top": self.is_building(tile_x, tile_y - 1),
-            "bottom": self.is_building(tile_x, tile_y + 1),
-            "left": self.is_building(tile_x - 1, tile_y),
-            "right": self.is_building(tile_x + 1, tile_y),
-            "top_left": self.is_building(tile_x - 1, tile_y - 1),
-            "top_right": self.is_building(tile_x + 1, tile_y - 1),
-            "bottom_left": self.is_building(tile_x - 1, tile_y + 1),
-            "bottom_right": self.is_building(tile_x + 1, tile_y + 1)
-        }
-
-        # Determinar tipo de sprite basado en vecinos
-        has_top = neighbors["top"]
-        has_bottom = neighbors["bottom"]
-        has_left = neighbors["left"]
-        has_right = neighbors["right"]
-
-        # Esquinas
-        if not has_top and not has_left:
-            return "top_left"
-        elif not has_top and not has_right:
-            return "top_right"
-        elif not has_bottom and not has_left:
-            return "bottom_left"
-        elif not has_bottom and not has_right:
-            return "bottom_right"
-
-        # Bordes
-        elif not has_left and (has_top or has_bottom):
-            return "left_border"
-        elif not has_right and (has_top or has_bottom):
-            return "right_border"
-        elif not has_bottom and (has_left or has_right):
-            return "bottom_border"
-        elif not has_top and (has_left or has_right):
-            return "top_edge"
-
-        # Centro por defecto
-        else:
-            return "center"
+    def build_building_sprite_index(self):
+        """
+        Precalcula el índice de sprite de cada tile con una tabla de autotile por bitmask.
+        Cada fila se procesa completa como un entero (un byte por tile), de modo que los
+        vecinos se obtienen con desplazamientos en lugar de revisar tile por tile.
+        """
+        width = self.width
+        full = (1 << (8 * width)) - 1
+        rows = [
+            int.from_bytes("".join(row).encode("latin-1").translate(_BUILDING_FLAG_TABLE), "big")
+            for row in self.tiles
+        ]
+        index = bytearray()
+        for y, current in enumerate(rows):
+            top = rows[y - 1] if y > 0 else 0
+            bottom = rows[y + 1] if y + 1 < len(rows) else 0
+            left = current >> 8
+            right = (current << 8) & full
+            mask = current | (top << 1) | (bottom << 2) | (left << 3) | (right << 4)
+            index += mask.to_bytes(width, "big").translate(_AUTOTILE_TABLE)
+        self.building_sprite_index = index
+        return index
 
     def get_grass_sprite_type(self, tile_x, tile_y):
         """Devuelve el sprite de grass para parques (siempre 'center')"""
@@ -0,0 +1,293 @@
+import heapq
+from array import array
+from itertools import count
+
+
+class GridPathfinder:
+    """
+    Búsqueda de caminos directamente sobre los grids planos de Map (blocked_grid y surface_grid),
+    sin construir un grafo de nodos y aristas.
+
+    Reproduce el grafo que usaba el AI difícil con NetworkX:
+    - Nodos: tiles accesibles y tiles bloqueados adyacentes a un tile accesible (para entregas).
+    - Arista hacia un tile bloqueado: costo 10. Hacia un tile accesible: peso de superficie + modificador de clima.
+    - Vecinos en orden arriba, abajo, izquierda, derecha.
+    - Los tiles cerrados temporalmente (Map.close_tile) no son nodos.
+
+    Los nodos se identifican por su índice plano y * width + x.
+    """
+    BLOCKED_COST = 10.0
+
+    def __init__(self, mapa, weather_modifier=0.0, landmarks=None):
+        self.width = mapa.width
+        self.height = mapa.height
+        self.blocked_grid = mapa.blocked_grid
+        self.surface_grid = mapa.surface_grid
+        self.closed_grid = mapa.closed_grid
+        self.node_grid = self.build_node_grid()
+        # LandmarkOracle opcional: con él la heurística de A* es la cota ALT en vez de Manhattan
+        self.landmarks = landmarks
+        # Costo estático de entrar a cada tile (superficie o BLOCKED_COST); el clima se suma aparte
+        self.base_cost = array("d", (
+            self.BLOCKED_COST if is_blocked else surface
+            for is_blocked, surface in zip(self.blocked_grid, self.surface_grid)
+        ))
+        # Grids de costo ya calculados por modificador de clima: {modificador: (enter_cost, min_step_cost)}
+        self.cost_grids = {}
+        self.set_weather_modifier(weather_modifier)
+
+    def build_node_grid(self):
+        """1 si el tile es nodo del grafo: accesible, o bloqueado (sin estar cerrado) con algún vecino accesible."""
+        width, height = self.width, self.height
+        blocked = self.blocked_grid
+        closed = self.closed_grid
+        nodes = bytearray(len(blocked))
+        for index, is_blocked in enumerate(blocked):
+            if not is_blocked:
+                nodes[index] = 1
+                continue
+            if closed[index]:
+                continue
+            x = index % width
+            if ((index >= width and not blocked[index - width]) or
+                    (index + width < width * height and not blocked[index + width]) or
+                    (x > 0 and not blocked[index - 1]) or
+                    (x < width - 1 and not blocked[index + 1])):
+                nodes[index] = 1
+        return nodes
+
+    def neighbor_indices(self, index):
+        """Índices de los vecinos ortogonales dentro del mapa (arriba, abajo, izquierda, derecha)."""
+        width = self.width
+        x = index % width
+        neighbors = []
+        if index >= width:
+            neighbors.append(index - width)
+        if index + width < width * self.height:
+            neighbors.append(index + width)
+        if x > 0:
+            neighbors.append(index - 1)
+        if x < width - 1:
+            neighbors.append(index + 1)
+        return neighbors
+
+    def update_tiles(self, indices):
+        """
+        Actualiza el grafo después de cerrar o reabrir los tiles dados (índices planos): su costo
+        en todos los grids de clima y si ellos y sus vecinos siguen siendo nodos. Devuelve los
+        índices cuyo costo o condición de nodo pudo cambiar.
+        """
+        blocked = self.blocked_grid
+        closed = self.closed_grid
+        changed = set(indices)
+        for index in indices:
+            changed.update(self.neighbor_indices(index))
+            cost = self.BLOCKED_COST if blocked[index] else self.surface_grid[index]
+            self.base_cost[index] = cost
+            for weather_modifier, (enter_cost, _) in self.cost_grids.items():
+                enter_cost[index] = cost if blocked[index] else cost + weather_modifier
+        for index in changed:
+            if not blocked[index]:
+                self.node_grid[index] = 1
+            elif closed[index]:
+                self.node_grid[index] = 0
+            else:
+                self.node_grid[index] = 1 if any(not blocked[u] for u in self.neighbor_indices(index)) else 0
+        # Un tile reabierto puede ser más barato que el paso mínimo con que se armó un grid
+        for weather_modifier, (enter_cost, min_step_cost) in list(self.cost_grids.items()):
+            step_costs = [enter_cost[index] for index in indices if self.node_grid[index]]
+            if step_costs and min(step_costs) < min_step_cost:
+                self.cost_grids[weather_modifier] = (enter_cost, min(step_costs))
+        self.set_weather_modifier(self.weather_modifier)
+        return changed
+
+    def get_cost_grid(self, weather_modifier):
+        """
+        (enter_cost, min_step_cost) para el modificador de clima dado: el costo base más el
+        modificador en los tiles accesibles. Se calcula una sola vez por modificador.
+        """
+        grid = self.cost_grids.get(weather_modifier)
+        if grid is None:
+            enter_cost = array("d", (
+                cost if is_blocked else cost + weather_modifier
+                for cost, is_blocked in zip(self.base_cost, self.blocked_grid)
+            ))
+            # Costo mínimo de un paso: hace admisible la heurística Manhattan
+            node_costs = [cost for cost, is_node in zip(enter_cost, self.node_grid) if is_node]
+            grid = (enter_cost, min(node_costs) if node_costs else 0.0)
+            self.cost_grids[weather_modifier] = grid
+        return grid
+
+    def precompute_weather(self, weather_modifiers):
+        """Calcula de antemano los grids de costo de todos los modificadores (uno por condición de clima)."""
+        for weather_modifier in weather_modifiers:
+            self.get_cost_grid(weather_modifier)
+
+    def set_weather_modifier(self, weather_modifier):
+        """Cambia al grid de costos del modificador dado; si ya estaba calculado no recorre el mapa."""
+        self.weather_modifier = weather_modifier
+        self.enter_cost, self.min_step_cost = self.get_cost_grid(weather_modifier)
+
+    def has_node(self, position):
+        x, y = position
+        return 0 <= x < self.width and 0 <= y < self.height and self.node_grid[y * self.width + x] == 1
+
+    def _search(self, source, targets, h_goal=None, on_settle=None):
+        """
+        Núcleo de la búsqueda: heap binario de (prioridad, orden de inserción, nodo) desde el índice
+        source hasta asentar todos los índices de targets. Con h_goal=(x, y) suma la heurística
+        Manhattan hacia ese tile (o la cota ALT si hay landmarks). on_settle(índice, costo) se llama
+        al asentar cada target y, si devuelve True, la búsqueda termina ahí.
+        Devuelve (distancias, padres, asentados).
+        """
+        width = self.width
+        h_scale = self.min_step_cost if h_goal is not None else 0.0
+        goal_x, goal_y = h_goal if h_goal is not None else (0, 0)
+        landmark_bound = None
+        if h_goal is not None and self.landmarks is not None:
+            goal_index = goal_y * width + goal_x
+            index_bound = self.landmarks.index_bound
+            landmark_bound = lambda u: index_bound(u, goal_index)
+        remaining = set(targets)
+
+        enter_cost = self.enter_cost
+        nodes = self.node_grid
+        size = len(nodes)
+        push, pop = heapq.heappush, heapq.heappop
+        counter = count()
+        seen = {source: 0.0}
+        done = set()
+        parent = {source: -1}
+        fringe = [(0.0, next(counter), source)]
+        while fringe and remaining:
+            _, _, v = pop(fringe)
+            if v in done:
+                continue
+            done.add(v)
+            dist_v = seen[v]
+            if v in remaining:
+                remaining.discard(v)
+                if not remaining or (on_settle is not None and on_settle(v, dist_v)):
+                    break
+            x = v % width
+            for u in (v - width if v >= width else -1,
+                      v + width if v + width < size else -1,
+                      v - 1 if x > 0 else -1,
+                      v + 1 if x < width - 1 else -1):
+                if u < 0 or not nodes[u] or u in done:
+                    continue
+                vu_dist = dist_v + enter_cost[u]
+                if u not in seen or vu_dist < seen[u]:
+                    seen[u] = vu_dist
+                    parent[u] = v
+                    if h_scale:
+                        uy, ux = divmod(u, width)
+                        h = (abs(ux - goal_x) + abs(uy - goal_y)) * h_scale
+                        if landmark_bound is not None:
+                            h = max(h, landmark_bound(u))
+                        priority = vu_dist + h
+                    else:
+                        priority = vu_dist
+                    push(fringe, (priority, next(counter), u))
+        return seen, parent, done
+
+    def distance_field(self, source, reverse=False, parents=None):
+        """
+        Dijkstra completo desde el índice source. Devuelve un array con el costo de source a cada
+        tile, o con reverse=True el costo de cada tile a source (la arista u -> v cuesta entrar a v,
+        así que el grafo no es simétrico). Los tiles sin camino (o que no son nodos) quedan en inf.
+
+        Con parents (un array del tamaño del mapa) anota en cada tile el vecino del que se llegó:
+        con reverse=True es el siguiente paso de un camino óptimo hacia source.
+        """
+        width = self.width
+        enter_cost = self.enter_cost
+        nodes = self.node_grid
+        size = len(nodes)
+        push, pop = heapq.heappush, heapq.heappop
+        dist = array("d", [float("inf")]) * size
+        dist[source] = 0.0
+        done = bytearray(size)
+        fringe = [(0.0, source)]
+        while fringe:
+            dist_v, v = pop(fringe)
+            if done[v]:
+                continue
+            done[v] = 1
+            x = v % width
+            step_cost = enter_cost[v]
+            for u in (v - width if v >= width else -1,
+                      v + width if v + width < size else -1,
+                      v - 1 if x > 0 else -1,
+                      v + 1 if x < width - 1 else -1):
+                if u < 0 or not nodes[u] or done[u]:
+                    continue
+                vu_dist = dist_v + (step_cost if reverse else enter_cost[u])
+                if vu_dist < dist[u]:
+                    dist[u] = vu_dist
+                    if parents is not None:
+                        parents[u] = v
+                    push(fringe, (vu_dist, u))
+        return dist
+
+    def search(self, start, goal, heuristic=True):
+        """
+        A* con heap binario desde start hasta goal (tuplas (x, y)).
+        Devuelve (costo, camino) o None si no hay camino o algún extremo no es nodo.
+
+        Con heuristic=False es Dijkstra con el mismo desempate que nx.dijkstra_path
+        (heap por (distancia, orden de inserción) y solo mejoras estrictas), así que
+        devuelve exactamente el mismo camino. Con la heurística Manhattan el costo es
+        el mismo, pero entre caminos de igual costo puede elegir otro.
+        """
+        if not self.has_node(start) or not self.has_node(goal):
+            return None
+        width = self.width
+        target = goal[1] * width + goal[0]
+        seen, parent, done = self._search(start[1] * width + start[0], (target,),
+                                          goal if heuristic else None)
+        if target not in done:
+            return None
+        return seen[target], self.path_from_tree(parent, goal)
+
+    def search_targets(self, start, goals, on_settle=None):
+        """
+        Una sola búsqueda (Dijkstra) desde start que se detiene cuando todos los goals alcanzables
+        quedan asentados. Devuelve (costos, padres): {goal: costo} de los goals con camino y el
+        árbol de predecesores, del que path_from_tree lee el camino a cualquiera de ellos.
+        Costos y caminos son los mismos que daría search(start, goal, heuristic=False) para cada goal.
+
+        on_settle(goal, costo) se llama en orden de costo creciente al asentar cada goal; si
+        devuelve True la búsqueda se corta y los goals aún no asentados no aparecen en costos.
+        """
+        if not self.has_node(start):
+            return {}, {}
+        width = self.width
+        targets = {goal[1] * width + goal[0]: goal for goal in goals if self.has_node(goal)}
+        settle = None
+        if on_settle is not None:
+            settle = lambda index, cost: on_settle(targets[index], cost)
+        seen, parent, done = self._search(start[1] * width + start[0], targets, on_settle=settle)
+        costs = {goal: seen[index] for index, goal in targets.items() if index in done}
+        return costs, parent
+
+    def path_from_tree(self, parent, goal):
+        """Reconstruye el camino [(x, y), ...] hasta goal siguiendo el árbol de predecesores."""
+        width = self.width
+        path = []
+        node = goal[1] * width + goal[0]
+        while node != -1:
+            path.append((node % width, node // width))
+            node = parent[node]
+        path.reverse()
+        return path
+
+    def find_path(self, start, goal, heuristic=True):
+        """Camino [(x, y), ...] de start a goal, o None si no existe."""
+        result = self.search(start, goal, heuristic)
+        return result[1] if result else None
+
+    def path_cost(self, start, goal, heuristic=True):
+        """Costo del camino más barato de start a goal, o None si no existe."""
+        result = self.search(start, goal, heuristic)
+        return result[0] if result else None
@@ -0,0 +1,175 @@
+import argparse
+import json
+import random
+
+import constants
+from AIController import AIController
+from character import Character
+from job_loader import load_jobs
+from job_manager import JobManager
+from landmarks import LandmarkOracle
+from map import Map
+from weather import Weather
+
+
+class VirtualClock:
+    """
+    Reloj controlado a mano para la simulación sin pantalla. Reemplaza a pygame.time.get_ticks
+    (get_ticks, en ms) y a time.time (time, en segundos); solo avanza cuando se llama advance.
+    """
+    def __init__(self, start_ms=0):
+        self.now_ms = start_ms
+
+    def advance(self, ms):
+        self.now_ms += ms
+
+    def get_ticks(self):
+        return int(self.now_ms)
+
+    def time(self):
+        return self.now_ms / 1000
+
+
+class HeadlessSimulation:
+    """
+    Partida sin ventana, audio ni sprites: avanza JobManager, Weather, Character y AIController
+    en pasos fijos sobre un VirtualClock, tan rápido como lo permita la CPU.
+    Sirve para evaluar dificultades del AI y archivos de trabajos en lote.
+
+    No hay jugador: cada trabajo que se libera se ofrece al AI, que lo acepta si le cabe
+    en el inventario (como al presionar [A]) o lo rechaza.
+    """
+    def __init__(self, ai_difficulty="medium", map_file="data/json_files/city_map.json",
+                 jobs_file="data/json_files/city_jobs.json", weather_file="data/json_files/city_weather.json",
+                 seed=None, step_ms=constants.SIMULATION_STEP_MS, search_budget_ms=None):
+        if seed is not None:
+            random.seed(seed)
+        self.clock = VirtualClock()
+        self.step_ms = step_ms
+        self.running = True
+
+        self.mapa = Map(map_file, tile_size=20, top_bar_height=constants.TOP_BAR_HEIGHT, load_sprites=False)
+        self.landmarks = LandmarkOracle.load_or_build(self.mapa, map_file)
+        self.job_manager = JobManager(load_jobs(jobs_file))
+        self.weather = Weather(weather_file, clock=self.clock.get_ticks)
+        with open(map_file, "r", encoding="utf-8") as f:
+            map_json = json.load(f)["data"]
+        self.tiempo_limite = map_json.get("max_time", 120)
+        self.objetivo_valor = map_json.get("goal", None)
+
+        # Mismo punto de partida que el AI en CourierQuestGame
+        self.aiCharacter = Character(29, 0, tile_size=20, screen=None, top_bar_height=constants.TOP_BAR_HEIGHT,
+                                     load_sprites=False, clock=self.clock.get_ticks)
+        self.ai_difficulty = ai_difficulty
+        # Sin search_budget_ms el AI medio busca a profundidad fija: las corridas son reproducibles
+        self.ai_controller = AIController(dificulty=ai_difficulty, game=self, clock=self.clock.time,
+                                          search_budget_ms=search_budget_ms)
+        self.ai_last_move_time = None
+        self.ai_move_interval = 300
+
+        self.steps = 0
+        self.jobs_accepted = 0
+        self.jobs_rejected = 0
+        self.jobs_delivered = 0
+        self.ai_moves = 0
+        self.proximity_checked = None  # (posición, versión del inventario) ya revisada para recoger/entregar
+
+    def get_elapsed_seconds(self):
+        return int(self.clock.now_ms / 1000)
+
+    def _offer_visible_jobs(self):
+        for job in self.job_manager.visible_jobs[:]:
+            if self.aiCharacter.inventory.accept_job(job):
+                self.jobs_accepted += 1
+            else:
+                self.jobs_rejected += 1
+            self.job_manager.remove_job(job.id)
+
+    def _update_ai_inventory(self, elapsed_seconds):
+        ai = self.aiCharacter
+        inventory = ai.inventory
+        position = (ai.tile_x, ai.tile_y)
+        # Solo se revisa cuando el AI cambió de tile o cambió su inventario
+        state = (position, inventory.version)
+        if state == self.proximity_checked:
+            return
+        for job in inventory.get_pickups_near(position):
+            if inventory.pickup_job(job, position):
+                ai.update_stats()
+        for job in inventory.get_dropoffs_near(position):
+            if inventory.deliver_job(job, position):
+                ai.complete_delivery(job, elapsed_seconds)
+                self.jobs_delivered += 1
+            ai.update_stats()
+        self.proximity_checked = (position, inventory.version)
+
+    def _update_ai_movement(self):
+        now = self.clock.now_ms
+        if self.ai_last_move_time is None or now - self.ai_last_move_time >= self.ai_move_interval:
+            dx, dy = self.ai_controller.manage_move(self.aiCharacter, self.weather, self.aiCharacter.inventory)
+            if (dx, dy) != (0, 0):
+                self.ai_moves += 1
+            self.aiCharacter.movement(dx, dy, self.mapa, weather=self.weather)
+            self.ai_last_move_time = now
+        if self.aiCharacter.resistencia_exhausto:
+            self.aiCharacter.restore_stamina()
+
+    def step(self):
+        """Avanza la simulación un paso fijo de step_ms."""
+        self.clock.advance(self.step_ms)
+        self.steps += 1
+        elapsed_seconds = self.get_elapsed_seconds()
+        self._update_ai_inventory(elapsed_seconds)
+        self._update_ai_movement()
+        self.job_manager.update_visible_jobs(elapsed_seconds)
+        self.weather.update(self.step_ms / 1000)
+        self._offer_visible_jobs()
+
+        if elapsed_seconds >= self.tiempo_limite:
+            self.running = False
+        elif self.objetivo_valor is not None and self.aiCharacter.score >= self.objetivo_valor:
+            self.running = False
+
+    def run(self, max_seconds=None):
+        """Corre la partida hasta que termine (o hasta max_seconds de juego) y devuelve el resultado."""
+        limit_ms = max_seconds * 1000 if max_seconds is not None else None
+        while self.running and (limit_ms is None or self.clock.now_ms < limit_ms):
+            self.step()
+        return self.get_results()
+
+    def get_results(self):
+        return {
+            "difficulty": self.ai_difficulty,
+            "game_seconds": self.clock.now_ms / 1000,
+            "steps": self.steps,
+            "score": self.aiCharacter.score,
+            "reputation": self.aiCharacter.reputation,
+            "goal_reached": self.objetivo_valor is not None and self.aiCharacter.score >= self.objetivo_valor,
+            "jobs_accepted": self.jobs_accepted,
+            "jobs_rejected": self.jobs_rejected,
+            "jobs_delivered": self.jobs_delivered,
+            "ai_moves": self.ai_moves
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación sin pantalla de Courier Quest para evaluar el AI.")
+    parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="medium")
+    parser.add_argument("--jobs", default="data/json_files/city_jobs.json")
+    parser.add_argument("--map", default="data/json_files/city_map.json")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("--search-budget-ms", type=float, default=None,
+                        help="presupuesto por decisión de la búsqueda iterativa del AI medio")
+    args = parser.parse_args()
+
+    for run_index in range(args.runs):
+        simulation = HeadlessSimulation(ai_difficulty=args.difficulty, map_file=args.map,
+                                        jobs_file=args.jobs, seed=args.seed + run_index,
+                                        search_budget_ms=args.search_budget_ms)
+        print(json.dumps(simulation.run(args.max_seconds)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+class JobSpatialHash:
+    """
+    Hash espacial tile -> trabajos: cada trabajo se registra en su tile (pickup o dropoff) y en
+    los 8 tiles vecinos, que son las posiciones desde las que se puede recoger o entregar
+    (Inventory.is_neighbor). Consultar una posición devuelve solo los trabajos que se activan
+    ahí, en O(1) sin importar cuántos trabajos haya.
+    """
+    def __init__(self):
+        self.cells = {}  # {(x, y): {job_id: job}} en orden de registro
+
+    def add(self, job, tile):
+        x, y = tile
+        cells = self.cells
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                key = (x + dx, y + dy)
+                cell = cells.get(key)
+                if cell is None:
+                    cell = cells[key] = {}
+                cell[job.id] = job
+
+    def remove(self, job, tile):
+        x, y = tile
+        cells = self.cells
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                key = (x + dx, y + dy)
+                cell = cells.get(key)
+                if cell is not None and cell.get(job.id) is job:
+                    del cell[job.id]
+                    if not cell:
+                        del cells[key]
+
+    def get(self, position):
+        """Trabajos que se activan desde position (lista nueva, se puede modificar el hash al recorrerla)."""
+        cell = self.cells.get(position)
+        return list(cell.values()) if cell else []
+
+    def clear(self):
+        self.cells = {}
@@ -4,7 +4,9 @@ import random
 import pygame
 
 class Weather:
-    def __init__(self, file):
+    def __init__(self, file, clock=None):
+        # clock: función que devuelve el tiempo actual en ms (por defecto pygame.time.get_ticks)
+        self.clock = clock if clock is not None else pygame.time.get_ticks
         with open(file, 'r') as f:
             data = json.load(f)["data"]
         
@@ -54,7 +56,7 @@ class Weather:
         #delta_time: tiempo transcurrido en segundos desde el último update
         
 
-        now = pygame.time.get_ticks()
+        now = self.clock()
         if self.last_change_time is None:
             self.last_change_time = now
 